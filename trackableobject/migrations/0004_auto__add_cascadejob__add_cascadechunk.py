@@ -0,0 +1,119 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        
+        # Adding model 'CascadeJob'
+        db.create_table('trackable_object_cascadejob', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('target_status', self.gf('django.db.models.fields.IntegerField')()),
+            ('action', self.gf('django.db.models.fields.CharField')(max_length=10)),
+            ('message', self.gf('django.db.models.fields.CharField')(max_length=100, blank=True)),
+            ('force', self.gf('django.db.models.fields.BooleanField')(default=False)),
+            ('user', self.gf('django.db.models.fields.related.ForeignKey')(related_name='cascade_jobs', to=orm['auth.User'])),
+            ('created_time', self.gf('django.db.models.fields.DateTimeField')()),
+        ))
+        db.send_create_signal('trackable_object', ['CascadeJob'])
+
+        # Adding model 'CascadeChunk'
+        db.create_table('trackable_object_cascadechunk', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('job', self.gf('django.db.models.fields.related.ForeignKey')(related_name='chunks', to=orm['trackable_object.CascadeJob'])),
+            ('level', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('content_type', self.gf('django.db.models.fields.related.ForeignKey')(to=orm['contenttypes.ContentType'])),
+            ('status_list', self.gf('django.db.models.fields.CharField')(max_length=20, blank=True)),
+            ('object_ids', self.gf('django.db.models.fields.TextField')()),
+            ('done', self.gf('django.db.models.fields.BooleanField')(default=False, db_index=True)),
+            ('updated_count', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('finished_time', self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True)),
+        ))
+        db.send_create_signal('trackable_object', ['CascadeChunk'])
+
+
+    def backwards(self, orm):
+        
+        # Deleting model 'CascadeChunk'
+        db.delete_table('trackable_object_cascadechunk')
+
+        # Deleting model 'CascadeJob'
+        db.delete_table('trackable_object_cascadejob')
+
+
+    models = {
+        'auth.group': {
+            'Meta': {'object_name': 'Group'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '80'}),
+            'permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'})
+        },
+        'auth.permission': {
+            'Meta': {'ordering': "('content_type__app_label', 'content_type__model', 'codename')", 'unique_together': "(('content_type', 'codename'),)", 'object_name': 'Permission'},
+            'codename': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        },
+        'auth.user': {
+            'Meta': {'object_name': 'User'},
+            'date_joined': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75', 'blank': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'groups': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Group']", 'symmetrical': 'False', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'user_permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'}),
+            'username': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '30'})
+        },
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'trackable_object.affectedbymerge': {
+            'Meta': {'object_name': 'AffectedByMerge'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'merge_event': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['trackable_object.MergeEvent']"}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {})
+        },
+        'trackable_object.cascadechunk': {
+            'Meta': {'object_name': 'CascadeChunk'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'done': ('django.db.models.fields.BooleanField', [], {'default': 'False', 'db_index': 'True'}),
+            'finished_time': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'job': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'chunks'", 'to': "orm['trackable_object.CascadeJob']"}),
+            'level': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'object_ids': ('django.db.models.fields.TextField', [], {}),
+            'status_list': ('django.db.models.fields.CharField', [], {'max_length': '20', 'blank': 'True'}),
+            'updated_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        'trackable_object.cascadejob': {
+            'Meta': {'object_name': 'CascadeJob'},
+            'action': ('django.db.models.fields.CharField', [], {'max_length': '10'}),
+            'created_time': ('django.db.models.fields.DateTimeField', [], {}),
+            'force': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'message': ('django.db.models.fields.CharField', [], {'max_length': '100', 'blank': 'True'}),
+            'target_status': ('django.db.models.fields.IntegerField', [], {}),
+            'user': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'cascade_jobs'", 'to': "orm['auth.User']"})
+        },
+        'trackable_object.mergeevent': {
+            'Meta': {'object_name': 'MergeEvent'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True', 'db_index': 'True'})
+        }
+    }
+
+    complete_apps = ['trackable_object']
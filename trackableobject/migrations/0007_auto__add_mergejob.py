@@ -0,0 +1,150 @@
+# encoding: utf-8
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        
+        # Adding model 'MergeJob'
+        db.create_table('trackable_object_mergejob', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('action', self.gf('django.db.models.fields.CharField')(max_length=10)),
+            ('phase', self.gf('django.db.models.fields.CharField')(default='plan', max_length=10, db_index=True)),
+            ('content_type', self.gf('django.db.models.fields.related.ForeignKey')(to=orm['contenttypes.ContentType'])),
+            ('object_id', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('secondary_ids', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('merge_event', self.gf('django.db.models.fields.related.ForeignKey')(to=orm['trackable_object.MergeEvent'], null=True, blank=True)),
+            ('user', self.gf('django.db.models.fields.related.ForeignKey')(blank=True, related_name='merge_jobs', null=True, to=orm['auth.User'])),
+            ('message', self.gf('django.db.models.fields.CharField')(max_length=100, blank=True)),
+            ('force', self.gf('django.db.models.fields.BooleanField')(default=False)),
+            ('do_after_saved', self.gf('django.db.models.fields.BooleanField')(default=True)),
+            ('referrers', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('referrer_count', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('referrers_done', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('conflicts', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('conflict_count', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('conflicts_done', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('error', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('created_time', self.gf('django.db.models.fields.DateTimeField')()),
+            ('finished_time', self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True)),
+        ))
+        db.send_create_signal('trackable_object', ['MergeJob'])
+
+
+    def backwards(self, orm):
+        
+        # Deleting model 'MergeJob'
+        db.delete_table('trackable_object_mergejob')
+
+
+    models = {
+        'auth.group': {
+            'Meta': {'object_name': 'Group'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '80'}),
+            'permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'})
+        },
+        'auth.permission': {
+            'Meta': {'ordering': "('content_type__app_label', 'content_type__model', 'codename')", 'unique_together': "(('content_type', 'codename'),)", 'object_name': 'Permission'},
+            'codename': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        },
+        'auth.user': {
+            'Meta': {'object_name': 'User'},
+            'date_joined': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75', 'blank': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'groups': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Group']", 'symmetrical': 'False', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'user_permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'}),
+            'username': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '30'})
+        },
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'trackable_object.affectedbymerge': {
+            'Meta': {'object_name': 'AffectedByMerge'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'merge_event': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['trackable_object.MergeEvent']"}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {})
+        },
+        'trackable_object.cascadechunk': {
+            'Meta': {'object_name': 'CascadeChunk'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'done': ('django.db.models.fields.BooleanField', [], {'default': 'False', 'db_index': 'True'}),
+            'finished_time': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'job': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'chunks'", 'to': "orm['trackable_object.CascadeJob']"}),
+            'level': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'object_ids': ('django.db.models.fields.TextField', [], {}),
+            'status_list': ('django.db.models.fields.CharField', [], {'max_length': '20', 'blank': 'True'}),
+            'updated_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'})
+        },
+        'trackable_object.cascadejob': {
+            'Meta': {'object_name': 'CascadeJob'},
+            'action': ('django.db.models.fields.CharField', [], {'max_length': '10'}),
+            'created_time': ('django.db.models.fields.DateTimeField', [], {}),
+            'force': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'message': ('django.db.models.fields.CharField', [], {'max_length': '100', 'blank': 'True'}),
+            'target_status': ('django.db.models.fields.IntegerField', [], {}),
+            'user': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'cascade_jobs'", 'to': "orm['auth.User']"})
+        },
+        'trackable_object.mergeevent': {
+            'Meta': {'object_name': 'MergeEvent'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']", 'null': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True', 'db_index': 'True'}),
+            'secondary_ids': ('django.db.models.fields.TextField', [], {'blank': 'True'})
+        },
+        'trackable_object.mergejob': {
+            'Meta': {'object_name': 'MergeJob'},
+            'action': ('django.db.models.fields.CharField', [], {'max_length': '10'}),
+            'conflict_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'conflicts': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'conflicts_done': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'created_time': ('django.db.models.fields.DateTimeField', [], {}),
+            'do_after_saved': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'error': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'finished_time': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'force': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'merge_event': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['trackable_object.MergeEvent']", 'null': 'True', 'blank': 'True'}),
+            'message': ('django.db.models.fields.CharField', [], {'max_length': '100', 'blank': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'phase': ('django.db.models.fields.CharField', [], {'default': "'plan'", 'max_length': '10', 'db_index': 'True'}),
+            'referrer_count': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'referrers': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'referrers_done': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'secondary_ids': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'user': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'merge_jobs'", 'null': 'True', 'to': "orm['auth.User']"})
+        },
+        'trackable_object.permissiongrant': {
+            'Meta': {'object_name': 'PermissionGrant'},
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'group': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'permission_grants'", 'null': 'True', 'to': "orm['auth.Group']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_restriction': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'perm': ('django.db.models.fields.CharField', [], {'max_length': '100', 'db_index': 'True'}),
+            'user': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'permission_grants'", 'null': 'True', 'to': "orm['auth.User']"})
+        }
+    }
+
+    complete_apps = ['trackable_object']
@@ -1,20 +1,25 @@
 import copy
 from datetime import datetime, timedelta
 import inspect
+from operator import attrgetter, or_
 
 from django import dispatch
 from django.conf import settings
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes import generic
 from django.contrib import messages
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
-from django.db.models import get_models, Q
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.db import connections, models, router, transaction
+from django.db.models import get_models, signals, F, Max, Q, Sum
+from django.db.models.fields import FieldDoesNotExist
 from django.db.models.query import QuerySet
 from django.http import Http404, HttpResponseForbidden
+from django.utils import simplejson
 from django.utils.html import escape as esc
 
+from trackable_object.utils import commit_on_success_unless_managed, RetryTransaction, run_in_transaction
+
 
 # Add an attribute to the Meta class. See here: http://bit.ly/lDHjh
 models.options.DEFAULT_NAMES = models.options.DEFAULT_NAMES + ('inherits_status_from',)
@@ -27,6 +32,21 @@ models.options.DEFAULT_NAMES = models.options.DEFAULT_NAMES + ('inherits_status_
 post_create = dispatch.Signal(providing_args=['instance', 'request', 'message'])
 post_update = dispatch.Signal(providing_args=['instance', 'request', 'message'])
 post_remove = dispatch.Signal(providing_args=['instance', 'request', 'message'])
+# post_bulk_create is emitted once per model by submit_many(), as well as post_create for each object
+post_bulk_create = dispatch.Signal(providing_args=['instances', 'request', 'message'])
+# post_bulk_update and post_bulk_remove are emitted once per model by QuerySet.edit_all() and
+# QuerySet.remove_all(), status cascades and merges. post_update and post_remove are still emitted
+# for each of the objects too, if anything receives them (see send_bulk_signals()), so connect to
+# the bulk signals instead to handle the objects without a query per object.
+post_bulk_update = dispatch.Signal(providing_args=['instances', 'request', 'message'])
+post_bulk_remove = dispatch.Signal(providing_args=['instances', 'request', 'message'])
+
+# Exceptions
+class ConcurrentModificationError(Exception):
+    """ Raised when an object is changed from a copy that was loaded before someone else saved a
+        change to the same object. Load the object again and retry the change.
+    """
+    pass
 
 # Decorators
 def use_model_status(method, *args, **kwargs):
@@ -45,6 +65,281 @@ def use_model_status(method, *args, **kwargs):
             return method(self, *args, **kwargs)
     return wrapped
 
+# Status inheritance registry
+# Maps each model to the list of (child model, field name) pairs of the models that inherit their
+# status from it through that field. Built once, by get_status_inheritance_registry()
+_status_inheritance_registry = None
+_status_children_by_class = {}
+
+def get_status_inheritance_registry():
+    """ Returns the status inheritance registry, building it the first time it is needed.
+
+        Django does not tell an app when every model has been loaded, so the registry is built
+        the first time a child lookup happens, which is after all the models are loaded.
+        A bad inherits_status_from raises ImproperlyConfigured instead of being ignored.
+    """
+    global _status_inheritance_registry
+    if _status_inheritance_registry is None:
+        registry = {}
+        for model in get_models():
+            if not hasattr(model._meta, 'inherits_status_from'):
+                continue
+            field_names = model._meta.inherits_status_from
+            if not isinstance(field_names, list):
+                field_names = [field_names]
+            for field_name in field_names:
+                try:
+                    field = model._meta.get_field(field_name)
+                except FieldDoesNotExist:
+                    raise ImproperlyConfigured("{0}.Meta.inherits_status_from names '{1}', which is not a field "
+                                               "on the model".format(model.__name__, field_name))
+                if not isinstance(field, models.ForeignKey) or isinstance(field.rel.to, basestring):
+                    raise ImproperlyConfigured("{0}.Meta.inherits_status_from names '{1}', which is not a foreign "
+                                               "key to an installed model".format(model.__name__, field_name))
+                if not issubclass(model, TrackableObject):
+                    raise ImproperlyConfigured("{0}.Meta.inherits_status_from is set, but {0} is not a "
+                                               "TrackableObject".format(model.__name__))
+                registry.setdefault(field.rel.to, []).append((model, field_name))
+        _status_inheritance_registry = registry
+    return _status_inheritance_registry
+
+# Reverse foreign key registry
+# Maps each model to the list of (model, field) pairs of the foreign keys that point to it.
+# Built once, by get_reverse_foreign_key_registry()
+_reverse_foreign_key_registry = None
+_referring_fields_by_class = {}
+
+def get_reverse_foreign_key_registry():
+    """ Returns the reverse foreign key registry, building it the first time it is needed.
+
+        Parent links of models that use concrete inheritance are not included, because they
+        are not references to another object.
+
+        Inspired by:
+            http://stackoverflow.com/questions/7539278/django-how-can-i-find-which-of-my-models-refer-to-a-model
+    """
+    global _reverse_foreign_key_registry
+    if _reverse_foreign_key_registry is None:
+        registry = {}
+        for model in get_models():
+            for field in model._meta.fields:
+                if isinstance(field, models.ForeignKey) and \
+                   not getattr(field.rel, 'parent_link', False):
+                    registry.setdefault(field.rel.to, []).append((model, field))
+        _reverse_foreign_key_registry = registry
+    return _reverse_foreign_key_registry
+
+def remap_column(model, column, mapping, extra_where='', extra_params=None, using=None):
+    """ Rewrites column on the rows of model's table where it has one of the keys of mapping,
+        setting it to the matching value, with a single UPDATE per 500 keys.
+
+        Args:
+            model - the model whose table is updated. For a field inherited through concrete
+                    inheritance, pass the parent model that stores the column
+            column - the database column to rewrite
+            mapping - a dict of old value: new value
+            extra_where (optional) - more SQL conditions, starting with AND
+            extra_params (optional) - the parameters for extra_where
+    """
+    using = using or model.objects.db
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    items = mapping.items()
+    for start in range(0, len(items), 500):
+        chunk = items[start:start + 500]
+        sql = 'UPDATE {0} SET {1} = CASE {1} {2} END WHERE {1} IN ({3}) {4}'.format(
+            qn(model._meta.db_table), qn(column),
+            ' '.join(['WHEN %s THEN %s'] * len(chunk)),
+            ', '.join(['%s'] * len(chunk)),
+            extra_where)
+        params = [value for item in chunk for value in item] + [key for key, value in chunk]
+        connection.cursor().execute(sql, params + list(extra_params or []))
+    transaction.commit_unless_managed(using=using)
+
+def lock_objects(keys, with_prev=False):
+    """ Locks the rows of the objects given by a list of (model, pk) pairs with SELECT ... FOR UPDATE,
+        until the end of the transaction.
+
+        The rows are locked in one deterministic order: by content type, and by id within a
+        content type. Code that locks all the rows it is about to rewrite in one call therefore
+        never deadlocks with other code that does the same.
+
+        If with_prev is True, the revisions that point to each TrackableObject are locked in the
+        same pass, since copying an object rewrites them too.
+    """
+    ids_by_model = {}
+    for model, pk in keys:
+        ids_by_model.setdefault(model, set()).add(pk)
+    for model, ids in sorted(ids_by_model.items(), key=lambda item: ContentType.objects.get_for_model(item[0]).id):
+        if issubclass(model, TrackableObject):
+            if with_prev:
+                ids |= set(model.all_objects.get_prev_ids(ids))
+            model.all_objects.lock(ids)
+        else:
+            ids = sorted(ids)
+            for start in range(0, len(ids), 500):
+                list(model._default_manager.select_for_update().filter(pk__in=ids[start:start + 500]) \
+                                           .order_by('pk').values_list('pk', flat=True))
+
+def with_perms(objs, user, perm_names=('approve', 'edit', 'remove')):
+    """ Sets what user may do to each of objs on obj.perms, with one _bulk_has_perms() call per
+        class of object, and returns objs. This is QuerySet.with_perms() for any list of objects.
+    """
+    objs_by_class = {}
+    for obj in objs:
+        objs_by_class.setdefault(obj.__class__, []).append(obj)
+    for cls, cls_objs in objs_by_class.items():
+        cls._bulk_has_perms(cls_objs, user, perm_names)
+    return objs
+
+def send_bulk_signals(bulk_signal, signal, model, objs, request, message=''):
+    """ Sends bulk_signal once for objs, and then signal for each of objs as the methods that
+        change one object do, so receivers of the per-object signals still see bulk changes.
+
+        The per-object signals are skipped if nothing is connected to signal, since casting
+        each object to its real type can take a query per object.
+    """
+    bulk_signal.send(sender=model, instances=objs, request=request, message=message)
+    if signal.receivers:
+        for obj in objs:
+            instance = obj.cast()
+            signal.send(sender=instance.__class__, instance=instance, request=request, message=message)
+
+def reserve_ids(model, count, using=None):
+    """ Takes count ids from the sequence of model's id column, so objects can be inserted with
+        their ids already set. Returns None if the database cannot hand out ids ahead of an insert,
+        which is anything but PostgreSQL, or if the model uses concrete inheritance.
+    """
+    using = using or model._default_manager.db
+    connection = connections[using]
+    if connection.vendor != 'postgresql' or model._meta.parents or not count:
+        return None
+    qn = connection.ops.quote_name
+    cursor = connection.cursor()
+    cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                   [qn(model._meta.db_table), model._meta.pk.column, count])
+    return [row[0] for row in cursor.fetchall()]
+
+def cascade_status(parents, request, status, action='edit', message='', force=False):
+    """ Gives status to every descendant of parents that inherits its status from them, in a
+        single transaction.
+
+        The descendants are found one level of the status inheritance tree at a time, and each
+        level is written with one bulk revision insert and one UPDATE per child model (in chunks
+        of 500), instead of an edit() or remove() for every object. Returns the number of
+        objects that were updated.
+
+        Args:
+            parents - a list of (obj, child_status_kwargs) pairs. child_status_kwargs are the
+                      status kwargs the children of obj must match, e.g. {'hidden': True}.
+                      If None, obj's current status is used
+            request
+            status - the status to give the descendants
+            action - 'edit' or 'remove'
+            message - an optional message describing why the statuses changed
+            force - If True, descendants are updated regardless of the user's permissions
+    """
+    frontier = [(obj.__class__, obj.__class__.objects.get_status_list(**(child_status_kwargs or obj.get_status_kwargs())), [obj.id])
+                for obj, child_status_kwargs in parents]
+    visited = set()
+    count = 0
+    with commit_on_success_unless_managed():
+        while frontier:
+            frontier, level_count = cascade_status_level(frontier, request, status, action=action,
+                                                         message=message, force=force, visited=visited)
+            count += level_count
+    return count
+
+def cascade_status_level(frontier, request, status, action='edit', message='', force=False, visited=None, lock=False):
+    """ Updates one level of a status cascade started by cascade_status().
+
+        Args:
+            frontier - a list of (model, status list, ids) tuples. The children of the objects of
+                       model with those ids whose status is in the status list are updated. An
+                       empty status list matches every status
+            visited (optional) - a set of (model, id) pairs of the objects that were already
+                                 updated, which is added to
+            lock (optional) - If True, the children are locked with SELECT ... FOR UPDATE, in id
+                              order, so that levels that run at the same time skip each other's objects
+
+        Returns a (frontier, count) pair, where frontier holds the parents of the next level and
+        count is the number of objects updated on this level.
+    """
+    if visited is None:
+        visited = set()
+
+    # Find the children of the whole level, grouped by model
+    children_by_model = {}
+    for model, status_list, ids in frontier:
+        for child_model, field_name in model._get_status_children():
+            children = children_by_model.setdefault(child_model, {})
+            for start in range(0, len(ids), 500):
+                queryset = child_model.objects.filter(**{field_name + '__in': ids[start:start + 500]}) \
+                                              .exclude(status=status)
+                if status_list:
+                    queryset = queryset.filter(status__in=status_list)
+                if lock:
+                    queryset = queryset.select_for_update().order_by('id')
+                for child in queryset:
+                    if (child_model, child.id) not in visited:
+                        children[child.id] = child
+
+    next_frontier = []
+    count = 0
+    for model, children in children_by_model.items():
+        objs = []
+        for child in children.values():
+            if not force:
+                if action == 'remove' and not child.has_remove_perm(request.user):
+                    continue
+                if action == 'edit' and \
+                   not (child.has_edit_perm(request.user) and child.status == model.HIDDEN and status == model.LIVE):
+                    continue
+            visited.add((model, child.id))
+            objs.append(child)
+        if not objs:
+            continue
+
+        original_statuses = dict([(obj.id, obj.status) for obj in objs])
+        for start in range(0, len(objs), 500):
+            chunk = objs[start:start + 500]
+            if action == 'remove':
+                updates = {'status': model.REMOVED,
+                           'removed_by': request.user,
+                           'removed_time': datetime.now(),
+                           'removal_message': message}
+                if model._overrides('remove_related'):
+                    for obj in chunk:
+                        obj.remove_related(request, message)
+                model._bulk_perform_action(chunk, request, model.REMOVED, updates)
+            else:
+                model._bulk_perform_action(chunk, request, model.EDITED, {'status': status})
+
+        for obj in objs:
+            obj._original_status = original_statuses[obj.id]
+            if action == 'remove' and model._overrides('do_if_removed'):
+                obj.do_if_removed(request, message)
+            if action == 'edit' and obj._is_hidden_to_live() and model._overrides('do_if_live'):
+                obj.do_if_live(request, message)
+            obj._original_status = obj.status
+        if action == 'remove':
+            send_bulk_signals(post_bulk_remove, post_remove, model, objs, request, message)
+        else:
+            send_bulk_signals(post_bulk_update, post_update, model, objs, request, message)
+        count += len(objs)
+
+        # The children of a removed object are removed too, but an edit only reaches the next
+        # level when it makes the objects live. Either way, the next level is found by the
+        # status each object had before it was updated
+        if action == 'remove' or status == model.LIVE:
+            ids_by_status = {}
+            for obj in objs:
+                ids_by_status.setdefault(original_statuses[obj.id], []).append(obj.id)
+            for original_status, ids in ids_by_status.items():
+                next_frontier.append((model, [original_status], ids))
+
+    return next_frontier, count
+
 # Overriding the default Django GenericForeignKey
 class TrackableObjectGenericForeignKey(generic.GenericForeignKey):
     def __get__(self, instance, instance_type=None):
@@ -124,6 +419,155 @@ class AllTrackableObjectManager(TrackableObjectManager):
     def get_query_set(self, **kwargs): 
         return self.model.QuerySet(self.model)
 
+    def archive(self, objs):
+        """ Moves objs, which must be saved non-head revisions, from the live table into the model's
+            history table. Does nothing if the model does not archive its revisions.
+
+            The objects keep their ids, so anything pointing to them still finds them. The ids
+            came from the live table's sequence, which create_history_model() makes sure is a
+            PostgreSQL sequence that never hands them out again.
+        """
+        history_model = self.model.history_model
+        if not history_model or not objs:
+            return
+        history_model.objects.bulk_create([self._to_history(obj) for obj in objs])
+
+        # Delete with raw SQL so Django does not look up related objects for a cascade.
+        # Revisions are never the target of a foreign key.
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        ids = [obj.pk for obj in objs]
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM {0} WHERE {1} IN ({2})'.format(qn(self.model._meta.db_table),
+                                                                   qn(self.model._meta.pk.column),
+                                                                   ', '.join(['%s'] * len(ids))),
+                       ids)
+        transaction.commit_unless_managed(using=self.db)
+
+        for obj in objs:
+            obj._archived = True
+
+    def filter_revisions(self, *args, **kwargs):
+        """ Looks up objects in both the live table and the model's history table, and returns
+            them as a list, whether or not the model archives its revisions.
+
+            Takes the same arguments as filter(), plus an optional order_by list of field names
+            and an optional limit on the number of objects, which is applied to the query on each
+            table. Delta-encoded revisions are returned as they are stored, with the fields they
+            did not store left blank. Use history(), _get_prev() or rebuild() to get complete
+            revisions.
+        """
+        order_by = kwargs.pop('order_by', None) or []
+        limit = kwargs.pop('limit', None)
+        queryset = self.filter(*args, **kwargs)
+        if order_by:
+            queryset = queryset.order_by(*order_by)
+        if limit is not None:
+            queryset = queryset[:limit]
+
+        objs = list(queryset)
+        history_model = self.model.history_model
+        if not history_model:
+            return objs
+
+        history_queryset = history_model.objects.filter(*args, **kwargs)
+        if order_by:
+            history_queryset = history_queryset.order_by(*order_by)
+        if limit is not None:
+            history_queryset = history_queryset[:limit]
+        objs += [self._from_history(history_obj) for history_obj in history_queryset]
+        for field_name in reversed(order_by):
+            objs.sort(key=attrgetter(field_name.lstrip('-')), reverse=field_name.startswith('-'))
+        if limit is not None:
+            objs = objs[:limit]
+        return objs
+
+    def get(self, *args, **kwargs):
+        """ Looks up an object in the live table, and then in the model's history table """
+        try:
+            return super(AllTrackableObjectManager, self).get(*args, **kwargs)
+        except self.model.DoesNotExist, e:
+            history_model = self.model.history_model
+            if not history_model:
+                raise
+            try:
+                return self._from_history(history_model.objects.get(*args, **kwargs))
+            except history_model.DoesNotExist:
+                raise e
+
+    def insert_revisions(self, objs):
+        """ Inserts new non-head revisions whose ids were already taken with reserve_ids(), with
+            one bulk insert. The revisions of a model that archives its revisions are written
+            straight to its history table, so each one is only written once.
+        """
+        history_model = self.model.history_model
+        if history_model:
+            history_model.objects.bulk_create([self._to_history(obj) for obj in objs])
+        else:
+            self.bulk_create(objs)
+        for obj in objs:
+            obj._state.adding = False
+            obj._state.db = self.db
+            obj._original_values = obj._get_field_values()
+            if history_model:
+                obj._archived = True
+
+    def get_prev_ids(self, ids):
+        """ Returns the ids of the revisions that point to the objects with the given ids, from
+            both the live table and the model's history table, with one query per 500 ids in each
+        """
+        return [prev_id for prev_ids in self.get_prev_ids_by_id(ids).values() for prev_id in prev_ids]
+
+    def get_prev_ids_by_id(self, ids):
+        """ Like get_prev_ids(), but returns a dict of id: the ids of the revisions that point to it """
+        ids = list(ids)
+        querysets = [self.get_query_set()]
+        if self.model.history_model:
+            querysets.append(self.model.history_model.objects.all())
+        prev_ids_by_id = {}
+        for queryset in querysets:
+            for start in range(0, len(ids), 500):
+                for points_to_id, prev_id in queryset.filter(points_to_id__in=ids[start:start + 500]) \
+                                                     .values_list('points_to_id', 'id'):
+                    prev_ids_by_id.setdefault(points_to_id, []).append(prev_id)
+        return prev_ids_by_id
+
+    def lock(self, ids):
+        """ Locks the rows of the objects with the given ids, in both the live table and the model's
+            history table, with SELECT ... FOR UPDATE. The rows are locked in order of id, 500 at a
+            time. The locks are held until the transaction ends, so call this inside one.
+        """
+        ids = sorted(set(ids))
+        querysets = [self.get_query_set()]
+        if self.model.history_model:
+            querysets.append(self.model.history_model.objects.all())
+        for queryset in querysets:
+            for start in range(0, len(ids), 500):
+                list(queryset.select_for_update().filter(pk__in=ids[start:start + 500]) \
+                             .order_by('id').values_list('id', flat=True))
+
+    def update_revisions(self, ids, **kwargs):
+        """ Updates the objects with the given ids in both the live table and the model's history table """
+        count = self.filter(pk__in=ids).update(**kwargs)
+        history_model = self.model.history_model
+        if history_model:
+            count += history_model.objects.filter(pk__in=ids).update(**kwargs)
+        return count
+
+    def _from_history(self, history_obj):
+        """ Returns an instance of the model for a row of the model's history table """
+        obj = self.model(**dict([(field.attname, getattr(history_obj, field.attname))
+                                 for field in self.model._meta.fields]))
+        obj._state.adding = False
+        obj._state.db = history_obj._state.db
+        obj._archived = True
+        return obj
+
+    def _to_history(self, obj):
+        """ Returns an instance of the model's history table for obj """
+        return self.model.history_model(**dict([(field.attname, getattr(obj, field.attname))
+                                                for field in self.model._meta.fields]))
+
 
 class AffectedByMergeManager(models.Manager):
     def create(self, merge_event, obj):
@@ -140,20 +584,627 @@ class AffectedByMergeManager(models.Manager):
         affected_by_merge_obj.save()
         return affected_by_merge_obj
 
+    def create_many(self, merge_event, objs):
+        """ Creates an AffectedByMerge object for each of objs with a single bulk insert
+
+            Args:
+                merge_event - An existing merge_event that has already been saved
+                objs - The saved objects that were affected by merge_event
+        """
+        self.bulk_create([AffectedByMerge(merge_event=merge_event,
+                                          content_type_id=obj.real_type_id,
+                                          object_id=obj.id)
+                          for obj in objs])
+
+    def create_many_for_field(self, merge_event, model, field_name, rows):
+        """ Records the objects of a model that has no history of its own whose foreign key
+            field_name was pointed at another object by merge_event, with one bulk insert per 500
+            objects, so that unmerging can point them back
+
+            Args:
+                merge_event - An existing merge_event that has already been saved
+                model - the model of the objects, which is not a TrackableObject
+                field_name - the name of the foreign key that was rewritten
+                rows - a list of (pk, id the foreign key pointed to before the merge) pairs
+        """
+        content_type_id = ContentType.objects.get_for_model(model).id
+        for start in range(0, len(rows), 500):
+            self.bulk_create([AffectedByMerge(merge_event=merge_event,
+                                              content_type_id=content_type_id,
+                                              object_id=pk,
+                                              field_name=field_name,
+                                              previous_object_id=previous_object_id)
+                              for pk, previous_object_id in rows[start:start + 500]])
+
+    def repoint(self, content_type_id, mapping):
+        """ Moves the AffectedByMerge rows of objects of one content type to other objects of that
+            content type, with a single UPDATE per 500 objects
+
+            Args:
+                content_type_id - the id of the real type of the objects
+                mapping - a dict of the id of each object whose rows are moved: the id of the
+                          object they are moved to
+        """
+        if len(mapping) == 1:
+            old_id, new_id = mapping.items()[0]
+            self.filter(content_type=content_type_id, object_id=old_id).update(object_id=new_id)
+        elif mapping:
+            remap_column(self.model, 'object_id', mapping,
+                         extra_where='AND {0} = %s'.format(connections[self.db].ops.quote_name('content_type_id')),
+                         extra_params=[content_type_id], using=self.db)
+
 
 class MergeEvent(models.Model):
     id = models.AutoField(primary_key=True, db_index=True)
 
+    # The class of the object the merge was made on, and the ids of the objects that were merged
+    # into it, in priority order. Set by TrackableObject.merge_many()
+    content_type = models.ForeignKey(ContentType, null=True, blank=True)
+    secondary_ids = models.TextField(blank=True)
+
+    def get_secondary_ids(self, obj):
+        """ Returns the ids of the objects that were merged into obj by this merge event, in
+            priority order.
+
+            A merge event is shared by the merges of conflicting objects that a merge causes,
+            and only the first merge stores its secondary objects here. The others only have
+            the one in their secondary_merge_from field.
+
+            Args:
+                obj - the revision of the merged object that has this merge event
+        """
+        secondary_ids = [int(id) for id in self.secondary_ids.split(',') if id]
+        if self.content_type_id == obj.real_type_id and secondary_ids and \
+           secondary_ids[0] == obj.secondary_merge_from_id:
+            return secondary_ids
+        return [obj.secondary_merge_from_id]
+
 
 class AffectedByMerge(models.Model):
+    """ An object whose foreign keys were rewritten by a merge, or that was merged into another
+        object because of one, so that unmerging undoes it too.
+
+        The rows are looked up by (content_type, object_id) and by (merge_event, content_type,
+        object_id). Both composite indexes are created by migration 0008, since Django cannot
+        declare them on the model.
+    """
     merge_event = models.ForeignKey(MergeEvent)
     content_type = models.ForeignKey(ContentType)
     object_id = models.PositiveIntegerField()
     content_object = TrackableObjectGenericForeignKey('content_type', 'object_id')
 
+    # Only set for objects that are not TrackableObjects, and so have no revisions to restore:
+    # the foreign key the merge rewrote, and the id it pointed to before
+    field_name = models.CharField(max_length=100, blank=True)
+    previous_object_id = models.PositiveIntegerField(null=True, blank=True)
+
     objects = AffectedByMergeManager()
 
 
+class PermissionGrantManager(models.Manager):
+    def for_user(self, user, model, perm):
+        """ Returns the grants and restrictions of perm on objects of model that apply to user:
+            the user's own rows, the rows of the user's groups, and the rows for everyone
+        """
+        everyone = Q(user__isnull=True, group__isnull=True)
+        if user.is_anonymous():
+            principals = everyone
+        else:
+            principals = everyone | Q(user=user) | Q(group__in=user.groups.all())
+        return self.filter(principals, content_type=ContentType.objects.get_for_model(model), perm=perm)
+
+
+class PermissionGrant(models.Model):
+    """ A special permission (or special restriction) that a user, a group or everyone has on one
+        head object, so that QuerySet.filter_perms() can find the objects in SQL.
+
+        The rows are a copy of what the has_special_perm() and has_special_restriction() hooks
+        decide. They are only kept for models that set use_permission_grants, and come from the
+        model's get_permission_grants() and get_permission_restrictions() hooks.
+        A row with neither a user nor a group applies to everyone.
+    """
+    user = models.ForeignKey(User, null=True, blank=True, related_name='permission_grants')
+    group = models.ForeignKey(Group, null=True, blank=True, related_name='permission_grants')
+    content_type = models.ForeignKey(ContentType)
+    object_id = models.PositiveIntegerField(db_index=True)
+    perm = models.CharField(max_length=100, db_index=True)
+    is_restriction = models.BooleanField(default=False)
+
+    objects = PermissionGrantManager()
+
+
+class CascadeJobManager(models.Manager):
+    def start(self, parents, request, status, action='edit', message='', force=False):
+        """ Starts a status cascade that runs in the background, in chunks that are spread across
+            workers, and returns its CascadeJob.
+
+            Takes the same arguments as cascade_status().
+        """
+        user = request.user if request and request.user and request.user.is_authenticated() else None
+        job = self.create(target_status=status,
+                          action=action,
+                          message=message,
+                          force=force,
+                          user=user,
+                          created_time=datetime.now())
+        frontier = [(obj.__class__, obj.__class__.objects.get_status_list(**(child_status_kwargs or obj.get_status_kwargs())), [obj.id])
+                    for obj, child_status_kwargs in parents]
+        job._queue(job._create_chunks(frontier, 0))
+        return job
+
+    def resume_stalled(self, older_than=timedelta(minutes=10)):
+        """ Queues again the chunks that have not finished older_than after they were queued,
+            because the task that ran them was lost. Returns the queued chunks.
+
+            A chunk that is still running holds its lock, so the queued task waits for it and
+            then finds the chunk done.
+        """
+        cutoff = datetime.now() - older_than
+        chunks = list(CascadeChunk.objects.select_related('job') \
+                                          .filter(Q(queued_time__lt=cutoff) | Q(queued_time=None, job__created_time__lt=cutoff),
+                                                  done=False))
+        chunks_by_job = {}
+        for chunk in chunks:
+            chunks_by_job.setdefault(chunk.job, []).append(chunk)
+        for job, job_chunks in chunks_by_job.items():
+            job._queue(job_chunks)
+        return chunks
+
+
+class CascadeJob(models.Model):
+    """ A status cascade that runs in the background.
+
+        The cascade is split into chunks of at most chunk_size parent objects. Each chunk updates
+        the children of its parents on its own task, and records the chunks for the next level
+        in the same transaction, so an interrupted cascade can be picked up again with resume().
+    """
+    target_status = models.IntegerField()
+    action = models.CharField(max_length=10)
+    message = models.CharField(max_length=100, blank=True)
+    force = models.BooleanField(default=False)
+    user = models.ForeignKey(User, null=True, blank=True, related_name='cascade_jobs')
+    created_time = models.DateTimeField()
+
+    chunk_size = 500
+
+    objects = CascadeJobManager()
+
+    def is_done(self):
+        return not self.chunks.filter(done=False).exists()
+
+    def progress(self):
+        """ Returns a dict describing how far the cascade has got """
+        chunks = self.chunks.aggregate(levels=Max('level'), updated=Sum('updated_count'))
+        chunk_count = self.chunks.count()
+        chunks_done = self.chunks.filter(done=True).count()
+        return {'id': self.id,
+                'done': chunk_count == chunks_done,
+                'chunks': chunk_count,
+                'chunks_done': chunks_done,
+                'levels': (chunks['levels'] or 0) + 1 if chunk_count else 0,
+                'updated': chunks['updated'] or 0}
+
+    def resume(self):
+        """ Queues every chunk of the cascade that has not finished. Returns the number of chunks queued. """
+        chunks = list(self.chunks.filter(done=False))
+        self._queue(chunks)
+        return len(chunks)
+
+    def _create_chunks(self, frontier, level):
+        """ Saves the parents in frontier as chunks of the given level and returns the chunks """
+        chunks = []
+        for model, status_list, ids in frontier:
+            content_type = ContentType.objects.get_for_model(model)
+            for start in range(0, len(ids), self.chunk_size):
+                chunks.append(CascadeChunk.objects.create(job=self,
+                                                          level=level,
+                                                          content_type=content_type,
+                                                          status_list=','.join([str(status) for status in status_list]),
+                                                          object_ids=','.join([str(id) for id in ids[start:start + self.chunk_size]])))
+        return chunks
+
+    def _queue(self, chunks):
+        from trackable_object.tasks import run_cascade_chunk
+        CascadeChunk.objects.filter(id__in=[chunk.id for chunk in chunks]).update(queued_time=datetime.now())
+        for chunk in chunks:
+            run_cascade_chunk.delay(chunk.id)
+
+
+class CascadeChunk(models.Model):
+    """ The parents of part of one level of a CascadeJob """
+    job = models.ForeignKey(CascadeJob, related_name='chunks')
+    level = models.PositiveIntegerField()
+    content_type = models.ForeignKey(ContentType)
+    status_list = models.CharField(max_length=20, blank=True)
+    object_ids = models.TextField()
+    done = models.BooleanField(default=False, db_index=True)
+    updated_count = models.PositiveIntegerField(default=0)
+    # When the chunk was last queued, so CascadeJob.objects.resume_stalled() can find lost chunks
+    queued_time = models.DateTimeField(null=True, blank=True, db_index=True)
+    finished_time = models.DateTimeField(null=True, blank=True)
+
+    def get_frontier(self):
+        """ Returns the chunk's parents in the form cascade_status_level() takes """
+        status_list = [int(status) for status in self.status_list.split(',') if status]
+        ids = [int(id) for id in self.object_ids.split(',') if id]
+        return [(self.content_type.model_class(), status_list, ids)]
+
+    def run(self):
+        """ Updates the children of the chunk's parents, and queues the chunks of the next level.
+
+            Running a chunk more than once has no further effect: a finished chunk does nothing,
+            and a chunk that was interrupted was rolled back as a whole.
+            The children are locked while they are updated, so chunks that run at the same time
+            never update the same object twice.
+        """
+        from trackable_object.utils import actor_request
+        with commit_on_success_unless_managed():
+            chunk = CascadeChunk.objects.select_for_update().get(pk=self.pk)
+            if chunk.done:
+                return []
+            job = chunk.job
+            frontier, count = cascade_status_level(chunk.get_frontier(), actor_request(job.user_id), job.target_status,
+                                                   action=job.action, message=job.message, force=job.force, lock=True)
+            next_chunks = job._create_chunks(frontier, chunk.level + 1)
+            chunk.done = True
+            chunk.updated_count = count
+            chunk.finished_time = datetime.now()
+            chunk.save()
+        job._queue(next_chunks)
+        return next_chunks
+
+
+class MergeJobManager(models.Manager):
+    def start_merge(self, obj, objs, request, message='', force=False, do_after_saved=True, merge_event=None, queue=True):
+        """ Starts a merge of objs into obj that runs as a MergeJob, and returns the job.
+
+            Takes the same arguments as TrackableObject.merge_many(). The job is run in the
+            background, unless queue is False, in which case the caller runs it with run().
+        """
+        return self._start(MergeJob.MERGE, obj, request, queue,
+                           secondary_ids=','.join([str(secondary.id) for secondary in objs]),
+                           message=message,
+                           force=force,
+                           do_after_saved=do_after_saved,
+                           merge_event=merge_event)
+
+    def start_unmerge(self, obj, request, message='', force=False, do_after_saved=True, merge_event=None, queue=True):
+        """ Starts an unmerge of obj that runs as a MergeJob, and returns the job.
+
+            Takes the same arguments as TrackableObject.unmerge(). The job is run in the
+            background, unless queue is False, in which case the caller runs it with run().
+        """
+        return self._start(MergeJob.UNMERGE, obj, request, queue,
+                           message=message,
+                           force=force,
+                           do_after_saved=do_after_saved,
+                           merge_event=merge_event)
+
+    def resume_stalled(self, older_than=timedelta(minutes=10)):
+        """ Queues again the jobs that have neither finished nor failed, and have not finished a
+            step for older_than, because the worker that ran them died. Returns the queued jobs.
+
+            A job that is still running a step holds its lock, so the queued run waits for that
+            step and only runs the steps after it.
+        """
+        cutoff = datetime.now() - older_than
+        jobs = list(self.exclude(phase=MergeJob.DONE) \
+                        .filter(Q(updated_time__lt=cutoff) | Q(updated_time=None, created_time__lt=cutoff), error=''))
+        for job in jobs:
+            job._queue()
+        return jobs
+
+    def _start(self, action, obj, request, queue, **kwargs):
+        user = request.user if request and request.user and request.user.is_authenticated() else None
+        now = datetime.now()
+        job = self.create(action=action,
+                          content_type_id=obj.real_type_id,
+                          object_id=obj.id,
+                          user=user,
+                          created_time=now,
+                          updated_time=now,
+                          **kwargs)
+        if queue:
+            job._queue()
+        return job
+
+
+class MergeJob(models.Model):
+    """ A merge or an unmerge that is run in phases, so that an interrupted job can be picked up
+        again with resume() instead of leaving the objects half merged.
+
+        A merge job goes through these phases:
+            plan - checks the merge, records the objects that point to the merged objects, and
+                   merges the objects themselves
+            rewrite - makes the recorded referrers point to the merged object, chunk_size
+                      referring objects at a time, and records the ones that would conflict
+            resolve - merges each conflicting referrer into the object it conflicts with
+            finalize - calls do_after_saved
+        An unmerge job goes through these phases:
+            plan - checks the unmerge, unmerges the object and the objects merged into it, and
+                   records the objects that were affected by the merge
+            rewrite - restores the recorded objects, chunk_size AffectedByMerge objects at a time
+            finalize - calls do_after_saved
+
+        Every step runs in its own transaction and saves the job's progress in that same
+        transaction, so a step that was interrupted is rolled back as a whole and run again.
+        updated_time is set by every step, so MergeJob.objects.resume_stalled() can find the jobs
+        whose worker died.
+    """
+    MERGE = 'merge'
+    UNMERGE = 'unmerge'
+
+    PLAN = 'plan'
+    REWRITE = 'rewrite'
+    RESOLVE = 'resolve'
+    FINALIZE = 'finalize'
+    DONE = 'done'
+
+    action = models.CharField(max_length=10)
+    phase = models.CharField(max_length=10, default=PLAN, db_index=True)
+
+    # The object that is merged into, or unmerged, and the objects merged into it
+    content_type = models.ForeignKey(ContentType)
+    object_id = models.PositiveIntegerField()
+    secondary_ids = models.TextField(blank=True)
+    merge_event = models.ForeignKey(MergeEvent, null=True, blank=True)
+    # The id of the head object the unmerged object had before the merge, for unmerge jobs
+    head_before_merge_id = models.PositiveIntegerField(null=True, blank=True)
+
+    user = models.ForeignKey(User, null=True, blank=True, related_name='merge_jobs')
+    message = models.CharField(max_length=100, blank=True)
+    force = models.BooleanField(default=False)
+    do_after_saved = models.BooleanField(default=True)
+
+    # JSON lists of [content type id, pk, field name] referrers, or of AffectedByMerge ids for
+    # unmerge jobs, and of the [referring object, conflicting object] conflicts as
+    # get_object_ref() references
+    referrers = models.TextField(blank=True)
+    referrer_count = models.PositiveIntegerField(default=0)
+    referrers_done = models.PositiveIntegerField(default=0)
+    conflicts = models.TextField(blank=True)
+    conflict_count = models.PositiveIntegerField(default=0)
+    conflicts_done = models.PositiveIntegerField(default=0)
+
+    error = models.TextField(blank=True)
+    created_time = models.DateTimeField()
+    updated_time = models.DateTimeField(null=True, blank=True, db_index=True)
+    finished_time = models.DateTimeField(null=True, blank=True)
+
+    chunk_size = 500
+
+    objects = MergeJobManager()
+
+    def get_object(self):
+        """ Returns the object that is merged into, or unmerged """
+        return self.content_type.model_class().all_objects.get(pk=self.object_id)
+
+    def is_done(self):
+        return self.phase == self.DONE
+
+    def progress(self):
+        """ Returns a dict describing how far the job has got """
+        return {'id': self.id,
+                'action': self.action,
+                'phase': self.phase,
+                'done': self.is_done(),
+                'referrers': self.referrer_count,
+                'referrers_done': self.referrers_done,
+                'conflicts': self.conflict_count,
+                'conflicts_done': self.conflicts_done,
+                'error': self.error}
+
+    def resume(self):
+        """ Queues the job again if it has not finished. Returns True iff the job was queued. """
+        if self.is_done():
+            return False
+        self._queue()
+        return True
+
+    def run(self):
+        """ Runs the steps of the job that have not finished yet, and returns the finished job.
+
+            The job is locked while each step runs, so running the same job on two workers at
+            once runs every step once. A step that deadlocks with another transaction, or raises
+            ConcurrentModificationError because an object was saved while it ran, is run again
+            by run_in_transaction(). If a step raises, the error is recorded on the job and the
+            exception is raised again.
+        """
+        from trackable_object.utils import actor_request
+        request = actor_request(self.user_id)
+
+        def run_step():
+            job = MergeJob.objects.select_for_update().get(pk=self.pk)
+            if not job.is_done():
+                job.error = ''
+                {self.PLAN: job._plan,
+                 self.REWRITE: job._rewrite,
+                 self.RESOLVE: job._resolve,
+                 self.FINALIZE: job._finalize}[job.phase](request)
+                job.updated_time = datetime.now()
+                job.save()
+            return job
+
+        while True:
+            try:
+                job = run_in_transaction(run_step, retry_on=(ConcurrentModificationError,))
+            except Exception, e:
+                MergeJob.objects.filter(pk=self.pk).update(error=unicode(e))
+                raise
+            if job.is_done():
+                return job
+
+    def _finish(self, error=''):
+        self.phase = self.DONE
+        self.error = error
+        self.finished_time = datetime.now()
+
+    def _finalize(self, request):
+        if self.do_after_saved:
+            self.get_object().do_after_saved(request, self.message)
+        self._finish()
+
+    def _get_secondaries(self):
+        """ Returns the objects that are merged into the job's object, in priority order """
+        ids = self._get_secondary_ids()
+        objs_by_id = dict([(obj.id, obj) for obj in self.content_type.model_class().all_objects.filter(pk__in=ids)])
+        return [objs_by_id[id] for id in ids if id in objs_by_id]
+
+    def _get_secondary_ids(self):
+        return [int(id) for id in self.secondary_ids.split(',') if id]
+
+    def _plan(self, request):
+        model = self.content_type.model_class()
+        try:
+            obj = model.objects.get(pk=self.object_id)
+        except model.DoesNotExist:
+            self._finish('The object is no longer a head object.')
+            return
+
+        if self.action == self.UNMERGE:
+            if not self.merge_event_id:
+                self.merge_event = obj._get_most_recent_merge_event()
+            if not self.merge_event:
+                self._finish('This object cannot be unmerged because it was never merged.')
+                return
+            obj_to_unmerge, obj_to_unmerge_is_self = obj._get_obj_to_unmerge(self.merge_event)
+            if not (self.force or (request and request.user and obj_to_unmerge.has_unmerge_perm(request.user))) or \
+               not obj.can_unmerge(self.merge_event):
+                self._finish('The object cannot be unmerged.')
+                return
+
+            secondaries, head_before_merge = obj._unmerge_objs(obj_to_unmerge, obj_to_unmerge_is_self,
+                                                               self.merge_event)
+            affected_by_merge_ids = list(AffectedByMerge.objects.filter(merge_event=self.merge_event) \
+                                                                .order_by('id').values_list('id', flat=True))
+            self.secondary_ids = ','.join([str(secondary.id) for secondary in secondaries])
+            self.head_before_merge_id = head_before_merge.id
+            self.referrers = simplejson.dumps(affected_by_merge_ids)
+            self.referrer_count = len(affected_by_merge_ids)
+            self.phase = self.REWRITE
+            return
+
+        objs = self._get_secondaries()
+        if len(objs) != len(self._get_secondary_ids()) or \
+           not all([secondary.is_head for secondary in objs]) or \
+           not obj._can_merge_all(objs, request, self.force):
+            self._finish('The objects cannot be merged.')
+            return
+
+        # The referrers are found and locked in the same transaction that retires objs, so no
+        # referrer is missed
+        referrers = obj._lock_for_merge(objs)
+        obj = obj._merge_objs(objs, request, self.message, self.merge_event)
+
+        self.merge_event = obj.merge_event
+        self.referrers = simplejson.dumps(sorted([[ContentType.objects.get_for_model(referring_model).id, pk, field_name]
+                                                  for referring_model, pk, field_name in referrers]))
+        self.referrer_count = len(referrers)
+        self.phase = self.REWRITE
+
+    def _queue(self):
+        from trackable_object.tasks import run_merge_job
+        run_merge_job.delay(self.id)
+
+    def _resolve(self, request):
+        from trackable_object.utils import get_objects_from_refs
+        # Each conflict is resolved in its own step, since resolving one merges objects recursively
+        conflict = get_objects_from_refs(simplejson.loads(self.conflicts)[self.conflicts_done])
+        if None not in conflict:
+            self.get_object()._resolve_merge_conflicts([conflict], request, self.message, self.merge_event,
+                                                       self.do_after_saved)
+        self.conflicts_done += 1
+        if self.conflicts_done >= self.conflict_count:
+            self.phase = self.FINALIZE
+
+    def _restore(self, request):
+        # Restore the objects recorded by the next chunk_size AffectedByMerge objects. Those that
+        # were already restored by a recursive unmerge were deleted, and are skipped
+        ids = simplejson.loads(self.referrers)[self.referrers_done:self.referrers_done + self.chunk_size]
+        self.get_object()._restore_affected_by_merge(AffectedByMerge.objects.filter(id__in=ids).order_by('id'),
+                                                     self.merge_event, self._get_secondary_ids(),
+                                                     self.head_before_merge_id, request, self.message)
+        self.referrers_done += len(ids)
+        if self.referrers_done >= self.referrer_count:
+            self.phase = self.FINALIZE
+
+    def _rewrite(self, request):
+        from trackable_object.utils import get_object_ref
+        if self.action == self.UNMERGE:
+            self._restore(request)
+            return
+
+        # Take the referrers of the next chunk_size referring objects. The referrers are sorted by
+        # object, so the foreign keys of one object are never split across two chunks
+        all_referrers = simplejson.loads(self.referrers)
+        keys = set()
+        end = self.referrers_done
+        while end < len(all_referrers):
+            key = tuple(all_referrers[end][:2])
+            if key not in keys and len(keys) == self.chunk_size:
+                break
+            keys.add(key)
+            end += 1
+        referrers = [(ContentType.objects.get_for_id(content_type_id).model_class(), pk, field_name)
+                     for content_type_id, pk, field_name in all_referrers[self.referrers_done:end]]
+
+        conflicts = self.get_object()._rewrite_referrers(self._get_secondaries(), referrers, request,
+                                                        self.message, self.merge_event)
+        conflicts = simplejson.loads(self.conflicts or '[]') + \
+                    [[get_object_ref(pointing_obj), get_object_ref(conflicting_obj)]
+                     for pointing_obj, conflicting_obj in conflicts]
+        self.conflicts = simplejson.dumps(conflicts)
+        self.conflict_count = len(conflicts)
+        self.referrers_done = end
+        if self.referrers_done >= self.referrer_count:
+            self.phase = self.RESOLVE if self.conflict_count else self.FINALIZE
+
+
+def create_history_model(model):
+    """ Creates a history table for a TrackableObject model, and makes the model archive its
+        non-head revisions there instead of keeping them in its live table.
+
+        The live table then only holds head objects (and objects merged into other objects), so
+        the head-only managers scan a table the size of the live dataset. all_objects.get(),
+        all_objects.filter_revisions() and the history methods read both tables.
+
+        Call this once, right after the model is defined, and create the new table with a migration:
+            TeamHistory = create_history_model(Team)
+
+        Models that use concrete inheritance cannot archive their revisions, and only PostgreSQL
+        can archive revisions at all. Revisions are written straight to the history table with ids
+        taken from the live table's sequence. Other databases can hand out the id of a deleted
+        live row again, such as SQLite tables without AUTOINCREMENT and InnoDB before MySQL 8.0
+        after a restart, which would collide with an archived revision.
+    """
+    assert not model._meta.parents, 'Models that use concrete inheritance cannot archive their revisions'
+    if connections[router.db_for_write(model)].vendor != 'postgresql':
+        raise ImproperlyConfigured('%s cannot archive its revisions, since only PostgreSQL can give '
+                                   'archived revisions ids that are never reused' % model.__name__)
+
+    class Meta:
+        app_label = model._meta.app_label
+        db_table = model._meta.db_table + '_history'
+
+    attrs = {'__module__': model.__module__, 'Meta': Meta}
+    for field in model._meta.local_fields:
+        field = copy.copy(field)
+        if isinstance(field, models.AutoField):
+            # Archived revisions keep the ids they were given in the live table
+            field.__class__ = models.IntegerField
+        elif field.unique:
+            field._unique = False
+            field.db_index = True
+        if field.rel:
+            field.rel = copy.copy(field.rel)
+            field.rel.related_name = '{0}_history_{1}+'.format(model._meta.object_name.lower(), field.name)
+        attrs[field.name] = field
+
+    history_model = type('{0}History'.format(model._meta.object_name), (models.Model,), attrs)
+    model.history_model = history_model
+    return history_model
+
+
 class TrackableObject(models.Model):
     """ This is an abstract base class and thus does not have its own table. All Leaguevine objects
         that require tracking who created/edited/removed them will inherit from this model and
@@ -222,6 +1273,19 @@ class TrackableObject(models.Model):
     # If True, it is the most recent revision of the object, and the only one users see
     is_head = models.BooleanField(default=True)
 
+    # The id of the head object of this object's family of revisions, and this object's position
+    # within that family. The head object's id never changes when it is edited, so every revision
+    # can find its head, and the whole history can be fetched, with a single indexed lookup.
+    # The head object itself has head_id set to its own id and the highest revision number.
+    head_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    head = TrackableObjectGenericForeignKey('real_type', 'head_id')
+    revision = models.PositiveIntegerField(default=0)
+
+    # Bumped every time the head object is changed. An edit, approve, reject, remove or merge only
+    # goes through if the object still has the version it was loaded with, so two people
+    # changing the same object at once cannot both fork its chain of revisions.
+    version = models.PositiveIntegerField(default=0, editable=False)
+
     # The object this object changed into. If a newer version of this object is saved, this copy remains
     # the same but a new one is created and this object will point to the new object
     points_to_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
@@ -241,6 +1305,18 @@ class TrackableObject(models.Model):
     # Objects that were modified (i.e. had modified foreign keys), are tracked by creating an
     # AffectedByMerge object that contains the affected object and this merge_event
     merge_event = models.ForeignKey(MergeEvent, null=True, blank=True)
+    # The most recent merge into this object that has not been unmerged, and a comma separated
+    # list of the ids of all of those merges, oldest first. Kept up to date on the head object by
+    # merge_many() and unmerge(), so finding the merge to undo is a single lookup.
+    # merge_lineage is None for objects that were merged before these fields existed.
+    latest_merge_event = models.ForeignKey(MergeEvent, null=True, blank=True, related_name="%(class)s_latest_merge_event")
+    merge_lineage = models.TextField(null=True, blank=True, default='', editable=False)
+
+    # Delta-encoded revisions (see revision_checkpoint_interval)
+    # None for objects that store every field. Otherwise a comma separated list of the fields
+    # this non-head revision stores; every other delta-encodable field was left blank because it
+    # is the same as in the next revision.
+    delta_fields = models.TextField(null=True, blank=True, editable=False)
 
     # Cache
     # Stores the time this object was last cached
@@ -262,6 +1338,35 @@ class TrackableObject(models.Model):
 
     update_cache_after_save = True
 
+    # If set to an integer N, copies of this object made when it is edited only store the fields
+    # defined on the subclass that changed in that edit, and every Nth revision stores all of its
+    # fields as a checkpoint. Fields defined on TrackableObject are always stored.
+    # Use rebuild() to get every field of a revision that may be delta-encoded.
+    revision_checkpoint_interval = None
+
+    # The attnames of the fields that track an object's revisions and merges rather than its data.
+    # Merging and unmerging never copy them from one object to another.
+    merge_bookkeeping_fields = ('id', 'is_head', 'head_id', 'revision', 'version', 'points_to_id',
+                                'primary_merge_from_id', 'secondary_merge_from_id', 'merge_event_id',
+                                'latest_merge_event_id', 'merge_lineage', 'delta_fields', 'real_type_id',
+                                'cache_time')
+
+    # The model that stores this model's non-head revisions. Set by create_history_model()
+    history_model = None
+
+    # If True, the special permissions from get_permission_grants() and
+    # get_permission_restrictions() are copied into the PermissionGrant table whenever a head
+    # object is saved through an action, and QuerySet.filter_perms() joins against that table
+    use_permission_grants = False
+
+    # Sets of fields, like unique_together, that no two head objects may share all the values of.
+    # Used by the default get_conflicts() and get_conflicts_bulk()
+    conflict_fields = ()
+
+    # Fields that record who performed the last action and when. Changing only these does not
+    # count as a change when deciding whether an edit needs a new revision.
+    untracked_field_names = ('action_taken', 'action_by', 'action_time', 'action_message', 'cache_time')
+
     @property
     def cache_key(self):
         if self.cache_time:
@@ -307,6 +1412,18 @@ class TrackableObject(models.Model):
     def class_name(self):
         return self.__class__.__name__
 
+    def get_dirty_fields(self):
+        """ Returns a list of the attnames of the fields that have changed since this object was
+            loaded from the database or last saved.
+
+            Fields that were deferred and never loaded are not included.
+        """
+        dirty_fields = []
+        for attname, value in self._get_field_values().items():
+            if attname not in self._original_values or self._original_values[attname] != value:
+                dirty_fields.append(attname)
+        return dirty_fields
+
     def get_status_kwargs(self):
         """ Returns a dict of kwargs the correspond to an object's current status. 
             For instance, if the object is live, this will return: {'live': True}
@@ -365,11 +1482,41 @@ class TrackableObject(models.Model):
         return fallback
 
     def save(self, *args, **kwargs):
+        """ Saves the object.
+
+            An object that was loaded from the database only writes the columns that changed, and
+            is not written at all (and its cache time is not bumped) if nothing changed.
+        """
+        if getattr(self, '_archived', False):
+            # This revision lives in the history table
+            self.__class__.all_objects._to_history(self).save(force_update=True)
+            return
         if self.is_head:
             self.assert_constraints()
         self.set_real_type()
-        self.refresh_cache()
-        super(TrackableObject, self).save(*args, **kwargs)
+
+        if self._can_save_dirty_fields(*args, **kwargs):
+            if not self.get_dirty_fields():
+                return
+            self.refresh_cache()
+            self._save_fields(using=kwargs.get('using'))
+        else:
+            self.refresh_cache()
+            if self.is_head and self.head_id is None and self.pk is None and not args and \
+               not kwargs.get('force_update'):
+                # A newly created head object starts its own family of revisions. Take its id from
+                # the sequence first where we can, so head_id is written by the INSERT itself
+                ids = reserve_ids(self.__class__, 1, using=kwargs.get('using'))
+                if ids:
+                    self.id = self.head_id = ids[0]
+                    kwargs['force_insert'] = True
+            super(TrackableObject, self).save(*args, **kwargs)
+            if self.is_head and self.head_id is None:
+                self.head_id = self.id
+                self.__class__.all_objects.filter(pk=self.pk).update(head_id=self.id)
+        self._original_values = self._get_field_values()
+        # Permission checks made before the object had an id are now cached on the user instead
+        self.__dict__.pop('_perm_cache', None)
 
     def set_real_type(self):
         if not self.real_type_id:
@@ -378,11 +1525,14 @@ class TrackableObject(models.Model):
     # Permissions & things to be overridden
     def approve(self, request, message='', do_after_saved=True, **kwargs):
         if self.has_approve_perm(request.user):
-            self.approve_related(request, message)
-            self.status = self._get_parent().status
-            self.approved_by = request.user
-            self.approved_time = datetime.now()
-            self._perform_action(request, self.APPROVED)
+            with commit_on_success_unless_managed():
+                # Claim the version first, so a stale copy is refused before approve_related() runs
+                self._lock_and_claim_version()
+                self.approve_related(request, message)
+                self.status = self._get_parent().status
+                self.approved_by = request.user
+                self.approved_time = datetime.now()
+                self._perform_action(request, self.APPROVED, version_claimed=True)
             if do_after_saved:
                 self.do_after_saved(request, message, **kwargs.pop('do_after_saved_kwargs', {}))
             if self.is_live():
@@ -458,6 +1608,9 @@ class TrackableObject(models.Model):
     def edit(self, request, message='', force=False, do_after_saved=True, async=True, **kwargs):
         """ Edits the object and records a full history of the action 
 
+            Raises ConcurrentModificationError if the object was changed by someone else after it
+            was loaded. approve(), reject(), remove() and merge() do the same.
+
             Args:
                 request
                 message - an optional message describing why the edit occurred
@@ -470,6 +1623,10 @@ class TrackableObject(models.Model):
         if force or \
            (self.has_edit_perm(request.user) and (self._is_hidden_to_live() or (self._original_status == self.status))):
 
+            # Nothing to record if no tracked field changed
+            if self.id and not self._state.adding and not self._has_tracked_changes():
+                return self
+
             child_status_kwargs = self.__class__.objects.get_status_kwargs([self._original_status]) 
 
             self._perform_action(request, self.EDITED)
@@ -507,9 +1664,30 @@ class TrackableObject(models.Model):
             break the database checks, so we need to create our own checks.
 
             The method is meant to be overridden by subclasses of TrackableObjects that require
-            unique or unique_together constraints.
+            unique or unique_together constraints. Subclasses that only need to compare fields
+            can set conflict_fields instead.
         """
-        return []
+        return self._get_field_conflicts([self])[0]
+
+    @classmethod
+    def get_conflicts_bulk(cls, objs):
+        """ The bulk version of get_conflicts(). Returns a list with the list of conflicting
+            objects for each object in objs, in the same order.
+
+            The conflicts on conflict_fields are found with one query per set of fields for
+            every 500 objects. Since objs are usually written together, an object also conflicts
+            with the objects before it in objs that share its values, after the conflicting
+            head objects.
+
+            If the class overrides get_conflicts(), that is called for each object instead, so
+            objs are only checked against the head objects and not against each other. Callers
+            that write objs together must then check and write them one at a time (see
+            _checks_conflicts_in_bulk()). Subclasses with other constraints can override this
+            to check a whole batch at once, e.g. the referrers that a merge rewrites.
+        """
+        if cls._overrides('get_conflicts'):
+            return [obj.get_conflicts() for obj in objs]
+        return cls._get_field_conflicts(objs)
 
     def has_add_perm(self, user):
         return self.has_perm(user, 'trackable_object.add_trackableobject') or \
@@ -525,7 +1703,7 @@ class TrackableObject(models.Model):
                self.has_remove_perm(user)
 
     def has_approve_perm(self, user):
-        return ((user != self.submitted_by) and self.has_perm(user, 'trackable_object.can_approve')) or \
+        return (not self._is_submitted_by(user) and self.has_perm(user, 'trackable_object.can_approve')) or \
                self.has_edit_perm(user) or \
                self.has_remove_perm(user)
     
@@ -551,28 +1729,33 @@ class TrackableObject(models.Model):
             2) If the user has a special permission for that perm
             3) If the user has a special restriction, they cannot do anything
             4) The user's default permission level (regular user/admin/etc)
+
+            The answer is cached on the user object, which lives for one request or task, so the
+            has_*_perm methods that call each other only run the checks once per perm. The cache
+            key includes the object's status and submitter, so changing either one invalidates it.
+            Use clear_perm_cache() when anything else a special permission depends on changes.
         """
-        try:
-            if perm == 'can_view': 
-                if (self.status == self.LIVE) or \
-                   ((self.status == self.HIDDEN) and (self.submitted_by == user)):
-                    return True
-                elif self.status == self.REMOVED:
-                    return False
-            else: # For all other permission types (i.e. edit, remove, approve, reject)
-                if user == self.submitted_by:
-                    return True
-        except:
-            pass
-        
-        if self.has_special_restriction(user, perm):
-            return self.has_special_perm(user, perm)
-        else:
-            return user.has_perm(perm) or self.has_special_perm(user, perm)
+        cache, key = self._get_perm_cache(user, perm)
+        if key not in cache:
+            cache[key] = self._has_perm(user, perm)
+        return cache[key]
 
     def has_remove_perm(self, user):
         return self.has_perm(user, 'trackable_object.delete_trackableobject')
 
+    def clear_perm_cache(self, user=None):
+        """ Forgets the cached permission checks for this object. 
+
+            Args:
+                user (optional) - the user to forget the checks of. If not given, only the checks
+                                  made before this object was saved are forgotten
+        """
+        self.__dict__.pop('_perm_cache', None)
+        if user is not None:
+            cache = getattr(user, '_trackable_object_perm_cache', {})
+            for key in [key for key in cache if key[:2] == (self.__class__, self.pk)]:
+                del cache[key]
+
     def has_special_perm(self, user, perm):
         """Used to identify a user's overriding permissions on an object.
         If a user has special_perm, then he/she can do any action add/approve/reject/remove
@@ -589,6 +1772,58 @@ class TrackableObject(models.Model):
         """
         return False
 
+    def get_merge_lineage(self):
+        """ Returns the ids of the merges into this object that have not been unmerged, oldest
+            first, as strings
+        """
+        if self.merge_lineage is not None:
+            return filter(None, self.merge_lineage.split(','))
+        elif self.head_id is not None:
+            # Every revision in the family that still has a merge_event is a merge that has not
+            # been unmerged
+            revisions = self.__class__.all_objects.filter_revisions(head_id=self.head_id, merge_event__isnull=False,
+                                                                    order_by=['revision'])
+            return [str(revision.merge_event_id) for revision in revisions]
+        merge_event = self._get_most_recent_merge_event()
+        return [str(merge_event.id)] if merge_event else []
+
+    def get_permission_grants(self):
+        """ Returns the special permissions on this object, for the PermissionGrant table, as a list
+            of (user or group or None, perm) pairs. None grants perm to everyone.
+
+            Models that set use_permission_grants override this to list what has_special_perm()
+            allows, e.g. every admin of a tournament for each of the perms they have.
+        """
+        return []
+
+    def get_permission_restrictions(self):
+        """ Returns the special restrictions on this object, for the PermissionGrant table, as a
+            list of (user or group or None, perm) pairs. None restricts everyone.
+        """
+        return []
+
+    @classmethod
+    def get_special_perm_ids(cls, user, perm, objs):
+        """ The bulk version of has_special_perm(). Returns the set of ids of the objects in objs
+            that user has a special permission for perm on.
+
+            The default calls has_special_perm() for each object if a subclass overrides it.
+            Subclasses whose has_special_perm() hits the database should override this as well,
+            so that QuerySet.with_perms() can answer for a whole list with one query.
+        """
+        if not cls._overrides('has_special_perm'):
+            return set()
+        return set([obj.pk for obj in objs if obj.has_special_perm(user, perm)])
+
+    @classmethod
+    def get_special_restriction_ids(cls, user, perm, objs):
+        """ The bulk version of has_special_restriction(). Returns the set of ids of the objects
+            in objs that user has a special restriction for perm on.
+        """
+        if not cls._overrides('has_special_restriction'):
+            return set()
+        return set([obj.pk for obj in objs if obj.has_special_restriction(user, perm)])
+
     def has_unmerge_perm(self, user):
         """ Checks that the user has permissions to unmerge an object """
         return self.has_perm(user, 'trackable_object.change_trackableobject')
@@ -597,6 +1832,21 @@ class TrackableObject(models.Model):
         """ Users can view LIVE objects or HIDDEN objects that they own """
         return self.has_perm(user, 'can_view')
 
+    def history(self):
+        """ Returns a list of every revision in this object's family, oldest first.
+
+            The head object is the last item. This is a single indexed query on head_id, rather
+            than following the 'points_to' chain one object at a time. Revisions of objects that
+            were merged into this one keep their own family and are not included.
+
+            If the model archives its revisions, both tables are read. Delta-encoded revisions
+            are filled in from the newer revisions of the family that were loaded with them.
+        """
+        family_id = self._get_family_id()
+        revisions = self.__class__.all_objects.filter_revisions(Q(head_id=family_id) | Q(pk=family_id),
+                                                                order_by=['revision', 'id'])
+        return self._fill_delta_fields(revisions)
+
     def make_live(self, request, message='', **kwargs):
         """ Marks the object as live and calls do_if_live """
         if self.has_edit_perm(request.user):
@@ -627,92 +1877,50 @@ class TrackableObject(models.Model):
                         user would typically have permission to edit the object
                 do_after_saved - If True, do_after_saved is called after the edit
         """
-        assert self.__class__ == obj.__class__
-        assert self == self.cast()
-        assert obj == obj.cast()
-        assert self.is_head == True
-        assert obj.is_head == True
-
-        # prefetch the objects pointing to obj before we do any manipulation
-        objs_pointing_to_obj = list(obj._get_objs_pointing_to_self())
-
-        if (force or (request and request.user and self.has_merge_perm(request.user, obj))) and \
-           self.can_merge(obj):
-
-            # copy the primary object (self) to be merged
-            old_self = self._copy_obj(self)
-
-            # loop over every field on the object, setting the field to the second one iff
-            # the second object has a value defined on the field and the first doesn't
-            field_dict = self.__dict__
-            for field in field_dict:
-                if not field.startswith('_') and \
-                   (not self.__getattribute__(field) and obj.__getattribute__(field)):
-                    self.__setattr__(field, obj.__getattribute__(field))
-
-            # create a copy of the secondary object, and make the head object point to 
-            # the primary object (self)
-            obj.is_head = False
-            obj.points_to_id = self.id
-            obj.edit(request=request, message=message, force=True, do_after_saved=True)
-
-            # Create a new merge event
-            if not merge_event:
-                merge_event = MergeEvent()
-                merge_event.save()
-
-            # save this object along with relevant merge data
-            self.merge_event = merge_event
-            self.points_to_id = None
-            self.is_head = True
-            self.action_taken = self.MERGED
-            self.action_time = datetime.now()
-            if request and request.user:
-                self.action_by = request.user 
-            self.primary_merge_from_id = old_self.id
-            self.secondary_merge_from_id = obj.id
-            self = self.merge_fields(request, obj, old_self)
-            self.save()
-
-            # find all models referencing this object's class via foreign key and update them
-            for pointing_obj in objs_pointing_to_obj:
+        return self.merge_many([obj], request=request, message=message, force=force,
+                               do_after_saved=do_after_saved, merge_event=merge_event, **kwargs)
 
-                # Find any foreign keys pointing to the object
-                for field in pointing_obj._meta.fields:
-                    if isinstance(field, models.ForeignKey) and \
-                       getattr(pointing_obj, field.name + '_id') == obj.id and \
-                       issubclass(self.__class__, getattr(pointing_obj, field.name).__class__):
+    def merge_many(self, objs, request=None, message='', force=False, do_after_saved=True, merge_event=None, **kwargs):
+        """ Merges several objects into this object in one pass and returns the merged object
 
-                        # Change the foreign key to point to the new object
-                        pointing_obj.__setattr__(field.name + '_id', self.id)
+            This is like calling merge() for each of objs, except that this object is copied
+            once, every object that pointed to one of objs is rewritten once, and a single
+            MergeEvent records the merge. The MergeEvent keeps the order of objs, so unmerge()
+            restores all of them.
 
-                        # Notice that pointing_obj.merge_event is not set. We leave it as None
-                        # because only objects that are the result of an object being merged into
-                        # it have the merge_event field set to anything besides None
+            The merge runs in one transaction, with this object, objs and their referrers locked,
+            so merges of unrelated objects can run at the same time. If the merge deadlocks with
+            another transaction, or objs gain referrers while they are being locked, it is rolled
+            back and raises. MergeJobs run their steps with run_in_transaction(), which tries
+            them again.
 
-                conflicting_objects = pointing_obj.get_conflicts()
-                
-                if conflicting_objects:
-                    # Re-fetch the pointing object to the point where the fields are not conflicting
-                    pointing_obj = pointing_obj.__class__.objects.get(id=pointing_obj.id)
-
-                    # If the newly saved object conflicts with others, get rid of this object
-                    # by merging it into the first conflicting object
-                    conflicting_obj = conflicting_objects[0]
-                    conflicting_obj.merge(pointing_obj, force=True, merge_event=merge_event,
-                                          request=request, message=message,
-                                          do_after_saved=do_after_saved)
-
-                    # Mark this conflicting object as affected by the merge so it will be unmerged
-                    # automatically if this object is unmerged later
-                    AffectedByMerge.objects.create(merge_event, conflicting_obj)
-
-                else:
-                    # Save any changes made
-                    pointing_obj.edit(request=request, message=message, force=True,
-                                      do_after_saved=False)
-
-                    AffectedByMerge.objects.create(merge_event, pointing_obj)
+            Args:
+                objs - the objects to be merged into this one, in priority order. Fields that are
+                       empty on this object are set from the first of objs that has a value
+                request
+                message - an optional message describing why the merge occurred
+                force - If True, the merge occurs regardless of whether or not the
+                        user would typically have permission to merge the objects
+                do_after_saved - If True, do_after_saved is called after the merge
+        """
+        assert self == self.cast()
+        assert self.is_head == True
+        assert objs and self not in objs
+        for obj in objs:
+            assert self.__class__ == obj.__class__
+            assert obj == obj.cast()
+            assert obj.is_head == True
+
+        if self._can_merge_all(objs, request, force):
+            with commit_on_success_unless_managed():
+                # find the objects pointing to objs before we do any manipulation. Only their keys are
+                # loaded now; the objects themselves are loaded in chunks when they are rewritten
+                referrers = self._lock_for_merge(objs)
+                self = self._merge_objs(objs, request, message, merge_event)
+
+                # find all models referencing this object's class via foreign key and update them
+                conflicts = self._rewrite_referrers(objs, referrers, request, message, self.merge_event)
+                self._resolve_merge_conflicts(conflicts, request, message, self.merge_event, do_after_saved)
 
             if do_after_saved:
                 self.do_after_saved(request, message, **kwargs.pop('do_after_saved_kwargs', {}))
@@ -734,11 +1942,14 @@ class TrackableObject(models.Model):
 
     def reject(self, request, message='', **kwargs):
         if self.has_approve_perm(request.user):
-            self.reject_related(request, message)
-            self.status = self.REJECTED
-            self.removed_by = request.user
-            self.removed_time = datetime.now()
-            self._perform_action(request, self.REJECTED)
+            with commit_on_success_unless_managed():
+                # Claim the version first, so a stale copy is refused before reject_related() runs
+                self._lock_and_claim_version()
+                self.reject_related(request, message)
+                self.status = self.REJECTED
+                self.removed_by = request.user
+                self.removed_time = datetime.now()
+                self._perform_action(request, self.REJECTED, version_claimed=True)
             self.do_if_removed(request, message)
             self.do_after_saved(request, message, **kwargs.pop('do_after_saved_kwargs', {}))
             if self.is_head:
@@ -796,12 +2007,106 @@ class TrackableObject(models.Model):
                 post_create.send(sender=self.cast().__class__, instance=self.cast(), request=request, message=message)
         return self
 
+    def sync_permission_grants(self):
+        """ Rewrites this object's rows in the PermissionGrant table. Call this when something the
+            special permission hooks depend on changes outside of an action, e.g. when a
+            tournament gets a new admin.
+        """
+        self._sync_permission_grants([self])
+
     def submit_hidden(self, request, message='', force=False, **kwargs):
         return self.submit(request, message, hidden=True, force=force, **kwargs)
 
     def submit_live(self, request, message='', force=False, **kwargs):
         return self.submit(request, message, live=True, force=force, **kwargs)
 
+    def rebuild(self):
+        """ Returns this revision with all of its fields filled in.
+
+            If this revision was delta-encoded, the fields it did not store are read from the
+            newer revisions in its family with a single query. Otherwise this returns self.
+            The returned object is a full revision, so saving it stores every field.
+        """
+        if self.delta_fields is None:
+            return self
+        newer_objs = list(self.__class__.all_objects.filter_revisions(head_id=self._get_family_id(),
+                                                                      revision__gt=self.revision,
+                                                                      order_by=['revision']))
+        obj = copy.copy(self)
+        self._fill_delta_fields([obj] + newer_objs)
+        return obj
+
+    @classmethod
+    def submit_many(cls, objs, request, message='', live=False, hidden=False, force=False):
+        """ Submits many new objects at once and returns them. This is the bulk version of submit().
+
+            The objects are grouped by class. For each class the permission check is run once,
+            against the first object, the statuses of the parent objects are looked up with one
+            query, and the objects are inserted with a single bulk_create. post_bulk_create is
+            sent once per class, and post_create for each object if anything receives it.
+
+            Unlike submit(), this does not check for duplicates. do_if_live, do_if_hidden and
+            do_after_saved are only called on each object if its class overrides them. Objects of
+            a class that the user may not add are returned without being saved.
+
+            Args:
+                objs - a list of new objects
+                request
+                message
+                live - If True, the objects are marked as live, as long as the user has permissions
+                       to add them
+                hidden - If True, the objects are marked as hidden, as long as the user has
+                         permissions to add them without approval
+                force - If True, the objects are submitted regardless of the user's perms
+        """
+        objs_by_class = {}
+        for obj in objs:
+            objs_by_class.setdefault(obj.__class__, []).append(obj)
+
+        user = request.user
+        for model, model_objs in objs_by_class.items():
+            if not (force or model_objs[0].has_add_perm(user)):
+                continue
+            can_add_without_approval = force or model_objs[0].has_add_without_approval_perm(user)
+            hidden_parent_ids = model._get_hidden_parent_ids(model_objs)
+
+            now = datetime.now()
+            is_pending_approval = False
+            for obj in model_objs:
+                parent_id = obj._get_parent_id()
+                if (hidden or (parent_id is not None and parent_id in hidden_parent_ids)) and \
+                   can_add_without_approval:
+                    obj.status = obj.HIDDEN
+                elif live or can_add_without_approval:
+                    obj.status = obj.LIVE
+                else:
+                    obj.status = obj.PENDING_APPROVAL
+                    is_pending_approval = True
+                obj._set_submit_params(request, message)
+                obj._reset_merge_fields(save=False)
+                obj.action_by = user
+                obj.action_time = now
+                obj.action_taken = obj.CREATED
+                obj.cache_time = now
+                obj.set_real_type()
+                obj.assert_constraints()
+
+            model._bulk_insert_heads(model_objs)
+
+            for obj in model_objs:
+                if obj.is_hidden() and model._overrides('do_if_hidden'):
+                    obj.do_if_hidden(request, message)
+                elif obj.is_live() and model._overrides('do_if_live'):
+                    obj.do_if_live(request, message)
+                if model._overrides('do_after_saved'):
+                    obj.do_after_saved(request, message)
+
+            if is_pending_approval:
+                messages.success(request, "Thank you for contributing to Leaguevine. Your submissions are currently "
+                                          "pending moderator approval. ")
+            send_bulk_signals(post_bulk_create, post_create, model, model_objs, request, message)
+        return objs
+
     def refresh_cache(self, async=True, foreign_key_async=False, save=False):
         """ Refresh the cache for this object and related objects
 
@@ -820,12 +2125,15 @@ class TrackableObject(models.Model):
     def remove(self, request, message='', do_after_saved=True, force=False, async=True, **kwargs):
         if force or self.has_remove_perm(request.user):
             child_status_kwargs = self.get_status_kwargs()
-            self.remove_related(request, message)
-            self.status = self.REMOVED
-            self.removed_by = request.user
-            self.removed_time = datetime.now()
-            self.removal_message = message
-            self._perform_action(request, self.REMOVED)
+            with commit_on_success_unless_managed():
+                # Claim the version first, so a stale copy is refused before remove_related() runs
+                self._lock_and_claim_version()
+                self.remove_related(request, message)
+                self.status = self.REMOVED
+                self.removed_by = request.user
+                self.removed_time = datetime.now()
+                self.removal_message = message
+                self._perform_action(request, self.REMOVED, version_claimed=True)
             self._update_child_statuses(request, child_status_kwargs=child_status_kwargs, status=self.REMOVED, action="remove", force=force, async=async) 
             self.do_if_removed(request, message)
             if do_after_saved:
@@ -865,91 +2173,14 @@ class TrackableObject(models.Model):
         if not merge_event:
             raise HttpResponseForbidden('This object cannot be unmerged because it was never merged.')
 
-        if self.merge_event == merge_event:
-            obj_to_unmerge = self
-            obj_to_unmerge_is_self = True
-        else:
-            # Find the object that is to be unmerged if it is not the head
-            obj_to_unmerge = self._get_prev_from_merge_event(merge_event)
-            obj_to_unmerge_is_self = False
-            assert obj_to_unmerge != None
+        obj_to_unmerge, obj_to_unmerge_is_self = self._get_obj_to_unmerge(merge_event)
 
         if (force or (request and request.user and obj_to_unmerge.has_unmerge_perm(request.user))) and \
            self.can_unmerge(merge_event):
-
-            # loop over every field on the object, resetting the field on the first object
-            # to how it was if it had been set by the second object originally
-            for field in obj_to_unmerge._meta.fields:
-                old_obj_1_field = getattr(obj_to_unmerge.primary_merge_from, field.name)
-                obj_1_field = getattr(self, field.name) # Get self's field because it may have changed
-                                                        # since the merge happened and we want to 
-                                                        # compare the most recent value
-                obj_2_field = getattr(obj_to_unmerge.secondary_merge_from, field.name)
-                if not field.name.startswith('_') and \
-                   (old_obj_1_field == None or old_obj_1_field == '' or old_obj_1_field == 0) and \
-                   obj_2_field and \
-                   obj_2_field == obj_1_field:
-                    setattr(obj_to_unmerge, field.name, old_obj_1_field)
-                    obj_to_unmerge.save()
-
-                    obj_to_unmerge._set_all_next_objs(field_name=field.name,
-                                                      value=old_obj_1_field,
-                                                      expected_value=obj_1_field)
-
-            # Primary_merge_from and secondary_merge_from are left as is, so we know which two objects
-            # the unmerge came from
-            obj_to_unmerge.merge_event = None
-            obj_to_unmerge.action_taken = self.UNMERGED
-            # obj_to_unmerge is NOT marked as head because it is not necessarily the head object that is being 
-            # unmerged. There are cases when an object that has later been edited and merged
-            # needs to be unmerged from a previous state to reproduce the secondary object as it existed back then
-            obj_to_unmerge.save()
-
-            # Restore the secondary_merge_from to exactly how it was before the original merge happened
-            obj_to_unmerge.secondary_merge_from.is_head = True
-            obj_to_unmerge.secondary_merge_from.points_to_id = None
-            obj_to_unmerge.secondary_merge_from.save()
-
-            # Restore all other objects that were affected by this merge
-            objs_affected_by_merge = [obj.content_object for obj in AffectedByMerge.objects.filter(merge_event=merge_event).order_by('id')]
-            for affected_obj in objs_affected_by_merge:
-
-                # Unmerge any objects that had been merged recursively
-                if affected_obj.merge_event == merge_event:
-                    affected_obj._get_head().unmerge(merge_event=merge_event, request=request, 
-                                                     message=message, force=True,
-                                                     do_after_saved=False)
-
-                # Fix any objects that modified one of their foreign keys due to the merge
-                else:
-                    obj_to_unmerge_head_before_merge = obj_to_unmerge._get_head_before_merge()
-                    affected_obj_head = affected_obj._get_head()
-                    for previous_affected_obj in affected_obj._get_prev():
-                        for field in affected_obj._meta.fields:
-                            # If this affected object points to this unmerged object and it's
-                            # previous object used to point to obj_2 instead of obj_1, then
-                            # reset this pointer to obj_2
-                            field_name = field.name + '_id'
-                            if isinstance(field, models.ForeignKey) and \
-                               hasattr(affected_obj, field_name) and \
-                               issubclass(self.__class__, getattr(affected_obj, field.name).__class__) and \
-                               getattr(affected_obj_head, field_name) == self.id and \
-                               getattr(affected_obj, field_name) == obj_to_unmerge_head_before_merge.id and \
-                               getattr(previous_affected_obj, field_name) == obj_to_unmerge.secondary_merge_from.id:
-                                setattr(affected_obj, field.name, obj_to_unmerge.secondary_merge_from)
-                                affected_obj.save()
-
-                                # Also set all objects this object points to to the secondary object as well
-                                affected_obj._set_all_next_objs(field_name=field.name + '_id', 
-                                                                value=obj_to_unmerge.secondary_merge_from,
-                                                                expected_value=self.id,
-                                                                force=True)
-                                # end if
-                            # end for field
-                        # End for previous obj
-                    affected_obj._remove_affected_by_merge(merge_event=merge_event)
-                    affected_obj.save()
-                    # end else
+            secondaries, head_before_merge = self._unmerge_objs(obj_to_unmerge, obj_to_unmerge_is_self, merge_event)
+            self._restore_affected_by_merge(AffectedByMerge.objects.filter(merge_event=merge_event).order_by('id'),
+                                            merge_event, [secondary.id for secondary in secondaries],
+                                            head_before_merge.id, request, message)
 
         if do_after_saved:
             self.do_after_saved(request, message, **kwargs.pop('do_after_saved_kwargs', {}))
@@ -960,53 +2191,441 @@ class TrackableObject(models.Model):
 
     # Private Methods
     def __init__(self, *args, **kwargs):
-        """ Save the original id value when this object is created so we can check if it changed """
+        """ Save the original field values when this object is created so we can check if they changed """
         super(TrackableObject, self).__init__(*args, **kwargs)
         self._original_id = self.id
         self._original_status = self.status
+        self._original_values = self._get_field_values()
+
+    def _can_save_dirty_fields(self, *args, **kwargs):
+        """ Returns True iff save() can write only the changed columns of this object with an UPDATE.
+
+            This needs an object that was loaded from the database (or already saved), whose
+            fields were all loaded, and a save() call without any of its special arguments.
+        """
+        return not args and \
+               not kwargs.get('force_insert') and \
+               not kwargs.get('force_update') and \
+               not self._state.adding and \
+               self.pk is not None and \
+               self.pk == self._original_id and \
+               len(self._original_values) == len(self._meta.fields)
+
+    def _can_merge_all(self, objs, request, force=False):
+        """ Returns True iff each of objs may be merged into this object by request.user, or by
+            anyone if force is True
+        """
+        return (force or (request and request.user and \
+                          all([self.has_merge_perm(request.user, obj) for obj in objs]))) and \
+               all([self.can_merge(obj) for obj in objs])
 
-    def _copy_obj(self, obj):
+    def _claim_version(self):
+        """ Bumps this head object's version with a conditional UPDATE, and raises
+            ConcurrentModificationError if the object has been changed since it was loaded.
+        """
+        expected_version = self._original_values.get('version', self.version)
+        updated = self.__class__.all_objects.filter(pk=self.id, version=expected_version) \
+                                            .update(version=F('version') + 1)
+        if not updated:
+            raise ConcurrentModificationError('%s %s was changed by someone else after it was loaded.'
+                                              % (self.__class__.__name__, self.id))
+        self.version = expected_version + 1
+
+    def _lock_and_claim_version(self):
+        """ Locks this head object until the end of the transaction, and then claims its version
+            with _claim_version()
+        """
+        if self.id:
+            self.__class__.all_objects.lock([self.id])
+            self._claim_version()
+
+    def _copy_obj(self, obj, newer=None):
         """ Takes an obj, creates a copy of it that then will point to obj, saves it, and returns it
 
             It fixes the pointer to the object specified by points_to. Whatever object had
             pointed to obj will point to this new object which will then point to obj.
 
-            The object copy will not be the "head" object and thus will not be visible to users
+            The object copy will not be the "head" object and thus will not be visible to users.
+            It takes obj's place in the family with obj's revision number, so the caller is
+            responsible for bumping the revision of the object that is saved next.
+
+            Args:
+                obj - the object to copy
+                newer (optional) - obj as it will be saved after the copy is made. If given and
+                                   revision_checkpoint_interval is set, the copy only stores the
+                                   fields that differ from newer, unless it is a checkpoint
         """
-        # Evaluate this query now before we save another object pointing to obj
-        previous_objects = list(obj._get_prev())
+        with commit_on_success_unless_managed():
+            # Lock obj, and then the tail of its chain, so that two copies of obj made at the same time
+            # cannot both take obj's place in the chain. Evaluate this query now before we save
+            # another object pointing to obj
+            obj.__class__.all_objects.lock([obj.id])
+            previous_object_ids = obj.__class__.all_objects.get_prev_ids([obj.id])
+            obj.__class__.all_objects.lock(previous_object_ids)
+
+            old_obj = self._build_copy(obj, newer)
+            ids = reserve_ids(obj.__class__, 1)
+            if ids:
+                old_obj.id = old_obj.pk = ids[0]
+                old_obj.refresh_cache()
+                obj.__class__.all_objects.insert_revisions([old_obj])
+            else:
+                old_obj.save()
+                obj.__class__.all_objects.archive([old_obj])
+
+            # Move any AffectedByMerge objects to the old_obj
+            AffectedByMerge.objects.repoint(obj.real_type_id, {obj.id: old_obj.id})
+
+            # Set the points_to field for each object that had pointed obj to the newly created object.
+            # This is to maintain the linked list of objects
+            if previous_object_ids:
+                obj.__class__.all_objects.update_revisions(previous_object_ids, points_to_id=old_obj.id)
+
+        return old_obj
+
+    def _build_copy(self, obj, newer=None):
+        """ Returns an unsaved copy of obj that will point to obj, for _copy_obj().
 
+            If newer is given and revision_checkpoint_interval is set, the copy only stores the
+            fields that differ from newer, unless it is a checkpoint.
+        """
         old_obj = copy.copy(obj)
+        old_obj.__dict__.pop('_perm_cache', None)
 
         # Both id and pk need to be set as noted here: http://bit.ly/y4vmB2
         old_obj.id = None
         old_obj.pk = None
         old_obj.points_to_id = obj.id
         old_obj.is_head = False
-        old_obj.save()
+        old_obj.head_id = obj._get_family_id()
+        old_obj.revision = obj.revision
+        interval = self.revision_checkpoint_interval
+        if newer is not None and interval and old_obj.revision % interval:
+            stored_fields = []
+            for field in self._get_delta_encodable_fields():
+                if getattr(old_obj, field.attname) == getattr(newer, field.attname):
+                    setattr(old_obj, field.attname, None if field.null else '')
+                else:
+                    stored_fields.append(field.attname)
+            old_obj.delta_fields = ','.join(stored_fields)
+        return old_obj
 
-        # Move any AffectedByMerge objects to the old_obj
-        affected_by_merge_queryset = AffectedByMerge.objects.filter(content_type=obj.real_type,
-                                                                    object_id=obj.id)
-        for affected_by_merge in affected_by_merge_queryset:
-            affected_by_merge.object_id = old_obj.id
-            affected_by_merge.save()
+    @classmethod
+    def _bulk_copy_objs(cls, objs, update_attnames=None):
+        """ The bulk version of _copy_obj() for head objects of this class.
 
-        # Set the points_to field for each object that had pointed obj to the newly created object.
-        # This is to maintain the linked list of objects
-        for previous_object in previous_objects:
-            previous_object.points_to_id = old_obj.id
-            previous_object.save()
+            Inserts a copy of every object in objs, makes the revisions that pointed to each
+            object point to its copy, and moves each object's AffectedByMerge rows to its copy.
+            Apart from the inserts, each step is one UPDATE per 500 objects. Returns the copies.
 
-        return old_obj
+            Args:
+                objs - saved head objects of this class, as they are in the database
+                update_attnames (optional) - a dict of attname: value that is about to be applied
+                                             to every object, used for delta-encoded revisions
+        """
+        if not objs:
+            return []
+
+        with commit_on_success_unless_managed():
+            # Lock the objects, so no other revision can take a copy's place in a chain, and the
+            # only new revisions pointing to the objects are the copies
+            cls.all_objects.lock([obj.id for obj in objs])
+
+            copies = []
+            for obj in objs:
+                newer = None
+                if update_attnames is not None:
+                    newer = copy.copy(obj)
+                    for attname, value in update_attnames.items():
+                        setattr(newer, attname, value)
+                copies.append(obj._build_copy(obj, newer))
+
+            ids = reserve_ids(cls, len(copies))
+            if ids:
+                # The ids of the copies are known before they are inserted, so the revisions that pointed
+                # to each object are relinked first, and the copies are written once, to their final table
+                for old_obj, id in zip(copies, ids):
+                    old_obj.id = old_obj.pk = id
+                cls._relink_revisions(copies)
+                cls.all_objects.insert_revisions(copies)
+            else:
+                # The revisions to relink are read before the copies are inserted, since the copies
+                # point to the objects too. Every row of the live table that exists before the copies
+                # are inserted has a lower id than the copies
+                prev_ids_by_id = cls.all_objects.get_prev_ids_by_id([obj.id for obj in objs])
+                max_id = cls.all_objects.aggregate(max_id=Max('id'))['max_id'] or 0
+                if cls._meta.parents:
+                    for old_obj in copies:
+                        old_obj.save()
+                else:
+                    cls.all_objects.bulk_create(copies)
+                    if copies[0].pk is None:
+                        copy_ids = dict(cls.all_objects.filter(id__gt=max_id, is_head=False,
+                                                               points_to_id__in=[obj.id for obj in objs])
+                                                       .values_list('points_to_id', 'id'))
+                        for old_obj in copies:
+                            old_obj.id = old_obj.pk = copy_ids[old_obj.points_to_id]
+                    for old_obj in copies:
+                        old_obj._state.adding = False
+                        old_obj._state.db = cls.all_objects.db
+                        old_obj._original_values = old_obj._get_field_values()
+                cls.all_objects.archive(copies)
+                cls._relink_revisions(copies, prev_ids_by_id)
+
+            # Move any AffectedByMerge objects to the copies
+            mapping_by_real_type = {}
+            for obj, old_obj in zip(objs, copies):
+                mapping_by_real_type.setdefault(obj.real_type_id, {})[obj.id] = old_obj.id
+            for real_type_id, real_type_mapping in mapping_by_real_type.items():
+                AffectedByMerge.objects.repoint(real_type_id, real_type_mapping)
+        return copies
+
+    @classmethod
+    def _relink_revisions(cls, copies, prev_ids_by_id=None):
+        """ Makes the revisions that pointed to each head object point to its copy from
+            _bulk_copy_objs() instead, with one UPDATE per 500 objects in each table.
+
+            Args:
+                copies - the copies, which point to the head objects
+                prev_ids_by_id (optional) - if the copies are already saved, the ids of the
+                                            revisions that pointed to each head object before
+                                            they were, from get_prev_ids_by_id(). Only those
+                                            revisions are relinked, so the copies are left alone
+        """
+        mapping = dict([(old_obj.points_to_id, old_obj.id) for old_obj in copies])
+        points_to_field = cls._meta.get_field('points_to_id')
+        revision_models = [points_to_field.model]
+        if cls.history_model:
+            revision_models.append(cls.history_model)
+        using = cls.all_objects.db
+        if prev_ids_by_id is None:
+            for revision_model in revision_models:
+                remap_column(revision_model, points_to_field.column, mapping, using=using)
+            return
+
+        mapping = dict([(id, copy_id) for id, copy_id in mapping.items() if id in prev_ids_by_id])
+        items = mapping.items()
+        qn = connections[using].ops.quote_name
+        for start in range(0, len(items), 500):
+            chunk = dict(items[start:start + 500])
+            prev_ids = [prev_id for id in chunk for prev_id in prev_ids_by_id[id]]
+            extra_where = 'AND {0} IN ({1})'.format(qn('id'), ', '.join(['%s'] * len(prev_ids)))
+            for revision_model in revision_models:
+                remap_column(revision_model, points_to_field.column, chunk,
+                             extra_where=extra_where, extra_params=prev_ids, using=using)
+
+    @classmethod
+    def _bulk_perform_action(cls, objs, request, action, updates=None):
+        """ The bulk version of _perform_action() for saved head objects of this class.
+
+            Records a revision of every object in objs, then applies updates and stamps the
+            action fields on all of them with a single UPDATE. The objects are updated in memory
+            as well. This does not check permissions or send any signals.
+
+            Like _claim_version(), the UPDATE only matches objects that still have the version
+            they were loaded with. If any of them was changed by someone else since, everything
+            is rolled back and ConcurrentModificationError is raised.
+
+            Args:
+                objs - head objects of this class, as they are in the database
+                request
+                action - the ID of the action. e.g. cls.EDITED, cls.REMOVED
+                updates (optional) - a dict of field name: value to set on every object
+        """
+        if not objs:
+            return objs
+        updates = updates or {}
+        update_attnames = dict([(cls._meta.get_field(name).attname, value)
+                                for name, value in [objs[0]._get_update_kwarg(name, value)
+                                                    for name, value in updates.items()]])
+
+        # save() checks every head object it writes, so check the objects as they are about to be
+        if cls._overrides('assert_constraints'):
+            for obj in objs:
+                newer = copy.copy(obj)
+                for attname, value in update_attnames.items():
+                    setattr(newer, attname, value)
+                newer.assert_constraints()
+
+        now = datetime.now()
+        user = request.user
+        stamp = {'action_by': user,
+                 'action_time': now,
+                 'action_taken': action,
+                 'cache_time': now,
+                 'merge_event': None,
+                 'primary_merge_from_id': None,
+                 'secondary_merge_from_id': None}
+        update_kwargs = dict(stamp)
+        update_kwargs.update(dict([objs[0]._get_update_kwarg(name, value) for name, value in updates.items()]))
+
+        # One condition per version the objects were loaded with, which is usually just a few
+        ids_by_version = {}
+        for obj in objs:
+            ids_by_version.setdefault(obj._original_values.get('version', obj.version), []).append(obj.id)
+        version_filter = reduce(or_, [Q(pk__in=ids, version=version) for version, ids in ids_by_version.items()])
+
+        with commit_on_success_unless_managed():
+            cls._bulk_copy_objs(objs, update_attnames)
+            updated = cls.all_objects.filter(version_filter).update(head_id=F('id'),
+                                                                    revision=F('revision') + 1,
+                                                                    version=F('version') + 1,
+                                                                    **update_kwargs)
+            if updated != len(objs):
+                raise ConcurrentModificationError('%d of %d %s objects were changed by someone else after they were loaded.'
+                                                  % (len(objs) - updated, len(objs), cls.__name__))
+        for obj in objs:
+            for name, value in stamp.items():
+                setattr(obj, name, value)
+            for attname, value in update_attnames.items():
+                setattr(obj, attname, value)
+            obj.head_id = obj.id
+            obj.revision += 1
+            obj.version += 1
+            obj._original_values = obj._get_field_values()
+        cls._sync_permission_grants(objs)
+        return objs
+
+    @classmethod
+    def _bulk_has_perm(cls, objs, user, perm):
+        """ The bulk version of has_perm() for saved objects of this class. Returns a list with
+            the answer for each object in objs, and caches the answers like has_perm() does.
+
+            The special permission hooks are called once for the whole list, through
+            get_special_perm_ids() and get_special_restriction_ids().
+        """
+        if cls._overrides('has_perm'):
+            return [obj.has_perm(user, perm) for obj in objs]
+
+        answers = [None] * len(objs)
+        undecided = []
+        for i, obj in enumerate(objs):
+            cache, key = obj._get_perm_cache(user, perm)
+            if key in cache:
+                answers[i] = cache[key]
+            elif perm == 'can_view' and \
+                 (obj.status == obj.LIVE or (obj.status == obj.HIDDEN and obj._is_submitted_by(user))):
+                answers[i] = True
+            elif perm == 'can_view' and obj.status == obj.REMOVED:
+                answers[i] = False
+            elif perm != 'can_view' and obj._is_submitted_by(user):
+                answers[i] = True
+            else:
+                undecided.append(i)
+
+        if undecided:
+            undecided_objs = [objs[i] for i in undecided]
+            restricted_ids = cls.get_special_restriction_ids(user, perm, undecided_objs)
+            special_ids = cls.get_special_perm_ids(user, perm, undecided_objs)
+            has_perm = user.has_perm(perm)
+            for i in undecided:
+                if objs[i].pk in restricted_ids:
+                    answers[i] = objs[i].pk in special_ids
+                else:
+                    answers[i] = has_perm or objs[i].pk in special_ids
+
+        for obj, answer in zip(objs, answers):
+            cache, key = obj._get_perm_cache(user, perm)
+            cache[key] = answer
+        return answers
+
+    @classmethod
+    def _bulk_has_perms(cls, objs, user, perm_names):
+        """ Sets obj.perms on every saved object of this class in objs to a dict of perm name: bool
+            for user, e.g. {'approve': True, 'edit': False}, using a constant number of queries.
+
+            Args:
+                perm_names - a list of names out of 'add', 'add_without_approval', 'approve', 'edit',
+                             'remove' and 'view'. Each name matches a has_<name>_perm() method, which
+                             is called for each object instead if a subclass overrides it
+        """
+        codenames = {'add': 'trackable_object.add_trackableobject',
+                     'add_without_approval': 'trackable_object.can_add_without_approval',
+                     'approve': 'trackable_object.can_approve',
+                     'edit': 'trackable_object.change_trackableobject',
+                     'remove': 'trackable_object.delete_trackableobject',
+                     'view': 'can_view'}
+        flags = {}
+
+        def get_flags(name):
+            if name not in flags:
+                if cls._overrides('has_{0}_perm'.format(name)):
+                    flags[name] = [getattr(obj, 'has_{0}_perm'.format(name))(user) for obj in objs]
+                    return flags[name]
+                own = cls._bulk_has_perm(objs, user, codenames[name])
+                if name == 'add':
+                    flags[name] = [a or b for a, b in zip(own, get_flags('add_without_approval'))]
+                elif name == 'add_without_approval':
+                    flags[name] = [a or b for a, b in zip(own, get_flags('approve'))]
+                elif name == 'approve':
+                    flags[name] = [(a and not obj._is_submitted_by(user)) or b or c
+                                   for obj, a, b, c in zip(objs, own, get_flags('edit'), get_flags('remove'))]
+                else:
+                    flags[name] = own
+            return flags[name]
+
+        for name in perm_names:
+            get_flags(name)
+        for i, obj in enumerate(objs):
+            obj.perms = dict([(name, flags[name][i]) for name in perm_names])
+        return objs
+
+    @classmethod
+    def _bulk_insert_heads(cls, objs):
+        """ Inserts new head objects of this class with as few queries as possible and sets their ids.
+
+            Where the database can hand out ids ahead of an insert, the ids (and so the head_ids)
+            are set first and the objects are written with a single bulk insert. Otherwise, and for
+            models that use concrete inheritance, the objects are saved one at a time, since
+            bulk_create does not tell us their ids.
+
+            Args:
+                objs - new objects of this class
+        """
+        with commit_on_success_unless_managed():
+            ids = reserve_ids(cls, len(objs))
+            if ids:
+                for obj, id in zip(objs, ids):
+                    obj.id = obj.pk = obj.head_id = id
+                cls.all_objects.bulk_create(objs)
+            else:
+                for obj in objs:
+                    obj.save()
+
+            for obj in objs:
+                obj._state.adding = False
+                obj._state.db = cls.all_objects.db
+                obj._original_values = obj._get_field_values()
+            cls._sync_permission_grants(objs)
+
+    @classmethod
+    def _fill_delta_fields(cls, objs):
+        """ Fills in the fields that delta-encoded revisions in objs did not store.
+
+            objs must be ordered from oldest to newest, and each run of objects from the same
+            family must be consecutive revisions ending in an object that stores every field,
+            such as the family head. The objects are modified in place.
+        """
+        newer = None
+        for obj in reversed(objs):
+            if obj.delta_fields is not None and newer is not None and \
+               newer._get_family_id() == obj._get_family_id():
+                stored_fields = set(obj.delta_fields.split(','))
+                for field in obj._get_delta_encodable_fields():
+                    if field.attname not in stored_fields:
+                        setattr(obj, field.attname, getattr(newer, field.attname))
+                obj.delta_fields = None
+            newer = obj
+        return objs
 
     def _get_affected_by_merge(self, merge_event=None):
         if not merge_event:
             merge_event = self._get_most_recent_merge_event()
         if merge_event:
-            affected_by_merge_queryset = AffectedByMerge.objects.filter(merge_event=merge_event, content_type=self.real_type, object_id=self.id)
-            if affected_by_merge_queryset:
-                return affected_by_merge_queryset[0]
+            affected_by_merges = list(AffectedByMerge.objects.filter(merge_event=merge_event, content_type=self.real_type_id,
+                                                                     object_id=self.id)[:1])
+            if affected_by_merges:
+                return affected_by_merges[0]
         return None
 
     def _get_children(self, **kwargs):
@@ -1017,35 +2636,98 @@ class TrackableObject(models.Model):
                 children. If no kwargs are specified, the current status of this parent object will be used.
                 example: self._get_children(live=True, hidden=True)
 
-            Pseudocode:
-                For every model in the code base:
-                    parent_model = get the model that it inherits status from
-                    base_classes = get all of the base classes for this object, along with the object's class itself
-                    if parent_model is in base_classes:
-                        find any objects that point to this object
+            The models and fields to look at come from the status inheritance registry, so this
+            only runs one query for each (child model, field) pair that points to this object's class.
         """
         children = []
-        self_class = self.__class__
         if kwargs:
             status_kwargs = kwargs
         else:
             status_kwargs = self.get_status_kwargs()
-        for model in get_models():
-            try:
-                parent_model_strings = model._meta.inherits_status_from
-                if not isinstance(parent_model_strings, list):
-                    parent_model_strings = [parent_model_strings]
-                for parent_model_string in parent_model_strings:
-                    parent_model = model.__getattribute__(model, parent_model_string).field.related.parent_model
-                    omitted_classes = [TrackableObject, models.Model, object]
-                    base_classes = [item for item in list(inspect.getmro(self_class)) if item not in omitted_classes]
-                    if parent_model in base_classes:
-                        kwargs = {"{0}".format(parent_model_string): self}
-                        children += list(model.objects.status(**status_kwargs).filter(**kwargs))
-            except:
-                pass
+        for model, field_name in self._get_status_children():
+            kwargs = {field_name: self}
+            children += list(model.objects.status(**status_kwargs).filter(**kwargs))
         return children
 
+    @classmethod
+    def _get_delta_encodable_fields(cls):
+        """ Returns the fields that a delta-encoded revision may leave blank.
+
+            These are the fields defined on the subclass, rather than on TrackableObject, that
+            can store a blank value: nullable fields and text fields.
+        """
+        if '_delta_encodable_fields' not in cls.__dict__:
+            tracking_field_names = set([field.name for field in TrackableObject._meta.fields])
+            cls._delta_encodable_fields = [
+                field for field in cls._meta.fields
+                if field.name not in tracking_field_names and \
+                   not field.primary_key and \
+                   not (field.rel and getattr(field.rel, 'parent_link', False)) and \
+                   (field.null or isinstance(field, (models.CharField, models.TextField)))
+            ]
+        return cls._delta_encodable_fields
+
+    def _get_family_head(self):
+        """ Returns the object that heads this object's family of revisions.
+
+            This is the head object, unless this object's family was later merged into another
+            object, in which case it is the object that was the head right before the merge.
+        """
+        family_id = self._get_family_id()
+        if family_id == self.id:
+            return self
+        return self.__class__.all_objects.get(pk=family_id)
+
+    def _get_family_id(self):
+        """ Returns the id of the head object of this object's family of revisions """
+        return self.head_id or self.id
+
+    @classmethod
+    def _get_field_conflicts(cls, objs):
+        """ Returns a list with the head objects, and then the objects before it in objs, that
+            share the values of one of the sets of conflict_fields with each object in objs, in
+            the same order
+        """
+        conflicts = [[] for obj in objs]
+        for field_names in cls.conflict_fields:
+            attnames = [cls._meta.get_field(field_name).attname for field_name in field_names]
+            for start in range(0, len(objs), 500):
+                chunk = objs[start:start + 500]
+                query = reduce(or_, [Q(**dict([(attname, getattr(obj, attname)) for attname in attnames]))
+                                              for obj in chunk])
+                objs_by_values = {}
+                for other_obj in cls.objects.filter(query).order_by('id'):
+                    values = tuple([getattr(other_obj, attname) for attname in attnames])
+                    objs_by_values.setdefault(values, []).append(other_obj)
+                for i, obj in enumerate(chunk):
+                    values = tuple([getattr(obj, attname) for attname in attnames])
+                    for other_obj in objs_by_values.get(values, []):
+                        if other_obj.pk != obj.pk and other_obj not in conflicts[start + i]:
+                            conflicts[start + i].append(other_obj)
+
+        for field_names in cls.conflict_fields:
+            attnames = [cls._meta.get_field(field_name).attname for field_name in field_names]
+            objs_by_values = {}
+            for i, obj in enumerate(objs):
+                values = tuple([getattr(obj, attname) for attname in attnames])
+                for other_obj in objs_by_values.get(values, []):
+                    if other_obj.pk != obj.pk and other_obj not in conflicts[i]:
+                        conflicts[i].append(other_obj)
+                objs_by_values.setdefault(values, []).append(obj)
+        return conflicts
+
+    @classmethod
+    def _checks_conflicts_in_bulk(cls):
+        """ Returns True iff get_conflicts_bulk() compares the objects it is given with each
+            other, so they can be checked together and then written together
+        """
+        return not cls._overrides('get_conflicts') or cls._overrides('get_conflicts_bulk')
+
+    def _get_field_values(self):
+        """ Returns a dict of attname: value for every field of this object that has been loaded """
+        return dict([(field.attname, self.__dict__[field.attname])
+                     for field in self._meta.fields if field.attname in self.__dict__])
+
     def _get_foreign_keys(self):
         """ Returns a set of all the objects that this object has foreign keys to """
         foreign_key_set = set()
@@ -1077,19 +2759,49 @@ class TrackableObject(models.Model):
         """
         if self.is_head:
             return self
-        else:
+        elif self.head_id is None:
+            # Revisions saved before head_id existed can only be found by walking the chain
             return self.points_to._get_head()
 
+        family_head = self._get_family_head()
+        if family_head.is_head:
+            return family_head
+        # This family was merged into another object, so continue from the merged object
+        return family_head.points_to._get_head()
+
     def _get_head_before_merge(self):
         """ Returns this object's head object by following the 'points_to' attribute but stops
             if it encounters that this object was merged into another object.
+
+            Only the head of a family can be merged into another object, so this is the
+            family head.
         """
+        if self.head_id is not None:
+            return self._get_family_head()
+
         points_to = self.points_to
         if self.is_head or points_to.secondary_merge_from == self:
             return self
         else:
             return points_to._get_head_before_merge()
 
+    @classmethod
+    def _get_hidden_parent_ids(cls, objs):
+        """ Returns the set of ids of the hidden objects that objs inherit their status from,
+            using a single query
+        """
+        if not hasattr(cls._meta, 'inherits_status_from'):
+            return set()
+        inherits_status_from = cls._meta.inherits_status_from
+        if isinstance(inherits_status_from, list):
+            inherits_status_from = inherits_status_from[0]
+        parent_model = cls._meta.get_field(inherits_status_from).rel.to
+        parent_ids = set([obj._get_parent_id() for obj in objs]) - set([None])
+        if not parent_ids:
+            return set()
+        return set(parent_model.all_objects.filter(pk__in=parent_ids, status=parent_model.HIDDEN) \
+                                           .values_list('id', flat=True))
+
     def _get_identical_object(self, request):
         """ Searches the database to see if there is another object of this same type that
             has all of the same parameters for submission.
@@ -1106,6 +2818,10 @@ class TrackableObject(models.Model):
         # Add the user to the filter perms
         filters['submitted_by'] = request.user
 
+        # The position in the revision history is not part of the submission
+        filters.pop('head_id')
+        filters.pop('revision')
+
         # Only look at items that were submitted in the last two minutes
         filters.pop('submitted_time')
         filters['submitted_time__gte'] = datetime.now() - timedelta(minutes=2)
@@ -1118,26 +2834,24 @@ class TrackableObject(models.Model):
         return None
 
     def _get_models_pointing_to_self(self):
-        """ Returns a list of models that have foreign keys that point to this object's model
-
-            Inspired by:
-                http://stackoverflow.com/questions/7539278/django-how-can-i-find-which-of-my-models-refer-to-a-model
-        """
-        all_models = models.get_models()
-        referers = []
-        for model in all_models:
-            for field in model._meta.fields:
-
-                # Grab any models that have foreign key fields that point to this object's model
-                if isinstance(field, models.ForeignKey) and issubclass(self.__class__, field.rel.to):
-                    referers.append(model)
-                    break
-        # return a uniquified list
-        return list(set(referers))
+        """ Returns a list of models that have foreign keys that point to this object's model """
+        return list(set([model for model, field in self._get_referring_fields()]))
 
     def _get_most_recent_merge_event(self):
-        if self.merge_event:
+        """ Returns the most recent merge into this object that has not been unmerged.
+
+            The head object stores it in latest_merge_event. For objects that were merged
+            before that field existed, it is read from the family's revisions, or searched for
+            through the previous revisions if the object has no head_id either.
+        """
+        if self.merge_event_id:
             return self.merge_event
+        elif self.merge_lineage is not None:
+            return self.latest_merge_event
+        elif self.head_id is not None:
+            merge_lineage = self.get_merge_lineage()
+            if merge_lineage:
+                return MergeEvent.objects.get(id=int(merge_lineage[-1]))
         else:
             all_prev = self._get_prev()
             for prev in all_prev:
@@ -1146,32 +2860,67 @@ class TrackableObject(models.Model):
                     return merge_event
         return None
 
+    def _get_next_objs(self):
+        """ Returns a list of the objects that come after this object in the linked list of
+            TrackableObjects linked by points_to, ordered from oldest to newest.
+
+            Each family of revisions is fetched with a single query, so this costs one query per
+            merge along the way rather than one query per revision.
+        """
+        next_objs = []
+        current = self
+        while current is not None and not current.is_head:
+            later_objs = list(self.__class__.all_objects.filter_revisions(head_id=current._get_family_id(),
+                                                                          revision__gt=current.revision,
+                                                                          order_by=['revision']))
+            next_objs += later_objs
+            if later_objs:
+                current = later_objs[-1]
+            if current.is_head:
+                break
+
+            # current is the head of a family that was merged into another object
+            current = current.points_to
+            if current is not None:
+                next_objs.append(current)
+        return next_objs
+
     def _get_objs_pointing_to_self(self, exclude_models=None):
         """ Returns a list of all objects that have foreign keys that point to this object 
         
             Args:
                 exclude_models - a comma separated list of model names to exclude from the search
         """
-        if not exclude_models:
-            exclude_models = []
+        return list(self._iter_objs_from_referrers(self._get_referrers(exclude_models)))
 
-        referring_models = self._get_models_pointing_to_self()
-        referers = []
-        for model in referring_models:
+    def _get_original_obj(self):
+        """ Returns a new instance of this object as it was loaded from the database.
 
-            # Check if this model should be skipped
-            if model.__name__ in exclude_models:
-                continue
-
-            # Query on the field that points to the object
-            for field in model._meta.fields:
-                if isinstance(field, models.ForeignKey) and issubclass(self.__class__, field.rel.to):
-                    kwargs = {}
-                    kwargs[field.name] = self
-                    referers += list(model.objects.filter(**kwargs))
+            This is built from the values saved when the object was loaded, so it does not need a
+            query, unless the object was never loaded or some of its fields were deferred. Those
+            values are only known to be current once _claim_version() has succeeded.
+        """
+        if self._state.adding or \
+           self._original_id != self.id or \
+           len(self._original_values) != len(self._meta.fields):
+            return self.__class__.all_objects.get(id=self.id)
+
+        obj = self.__class__(**self._original_values)
+        obj._state.adding = False
+        obj._state.db = self._state.db
+        return obj
+
+    def _get_obj_to_unmerge(self, merge_event):
+        """ Returns the revision of this head object that merge_event merged into, rebuilt, and
+            True iff that is this object itself
+        """
+        if self.merge_event == merge_event:
+            return self, True
 
-        # return a uniquified list without any instances of the object itself in it
-        return list(set(referers) - set([self]))
+        # Find the object that is to be unmerged if it is not the head
+        obj_to_unmerge = self._get_prev_from_merge_event(merge_event)
+        assert obj_to_unmerge != None
+        return obj_to_unmerge.rebuild(), False
 
     def _get_parent(self):
         if hasattr(self._meta, 'inherits_status_from'):
@@ -1181,23 +2930,167 @@ class TrackableObject(models.Model):
             return self.__getattribute__(inherits_status_from)
         return None
 
+    def _get_parent_id(self):
+        """ Returns the id of the object this object inherits its status from, without looking it up """
+        if hasattr(self._meta, 'inherits_status_from'):
+            inherits_status_from = self._meta.inherits_status_from
+            if isinstance(inherits_status_from, list):
+                inherits_status_from = inherits_status_from[0]
+            return getattr(self, self._meta.get_field(inherits_status_from).attname)
+        return None
+
+    def _get_perm_cache(self, user, perm):
+        """ Returns the dict that has_perm() caches its answer for user and perm in, and the key.
+
+            The answers for saved objects are cached on the user. Unsaved objects have no id yet,
+            so their answers are cached on the object itself until it is saved.
+        """
+        if self.pk is None:
+            cache = self.__dict__.setdefault('_perm_cache', {})
+            return cache, (getattr(user, 'pk', None), perm, self.status, self.submitted_by_id)
+        cache = getattr(user, '_trackable_object_perm_cache', None)
+        if cache is None:
+            cache = {}
+            setattr(user, '_trackable_object_perm_cache', cache)
+        return cache, (self.__class__, self.pk, perm, self.status, self.submitted_by_id)
+
     def _get_prev_from_merge_event(self, merge_event):
         """ Gets self's previous object that has a specific merge_event on it """
-        objs = self.__class__.all_objects.filter(merge_event=merge_event)
+        # At most two are fetched from each table to ensure there is only one of these
+        objs = self.__class__.all_objects.filter_revisions(merge_event=merge_event, limit=2)
 
         if objs:
-            # Ensure there is only one of these
             assert len(objs) == 1
             return objs[0]
         return None
 
     def _get_prev(self):
-        """ Gets a queryset of previous objects in the linked list of TrackableObjects linked by points_to """
-        return self.__class__.all_objects.filter(points_to_id=self.id)
+        """ Gets the previous objects in the linked list of TrackableObjects linked by points_to
+
+            This is a list, read from both tables if the model archives its revisions. The
+            delta-encoded revisions in it are filled in from this object.
+        """
+        prev_objs = self.__class__.all_objects.filter_revisions(points_to_id=self.id)
+        if [prev_obj for prev_obj in prev_objs if prev_obj.delta_fields is not None]:
+            newer = self.rebuild()
+            for prev_obj in prev_objs:
+                self._fill_delta_fields([prev_obj, newer])
+        return prev_objs
 
     def _get_real_type(self):
         return ContentType.objects.get_for_model(type(self))
 
+    def _get_referrers(self, exclude_models=None):
+        """ Returns a list of (model, pk, field name) tuples, one for every foreign key that points
+            to this object, without loading the referring objects.
+
+            This runs one query per (model, foreign key field) that can point to this object's
+            class, and each query only fetches primary keys. Use _iter_objs_from_referrers() to
+            load the objects in chunks.
+
+            Args:
+                exclude_models - a list of model names to exclude from the search
+        """
+        if not exclude_models:
+            exclude_models = []
+
+        referrers = []
+        for model, field in self._get_referring_fields():
+            if model.__name__ in exclude_models:
+                continue
+            kwargs = {field.name: self}
+            for pk in model._default_manager.filter(**kwargs).values_list('pk', flat=True):
+                # Leave out this object itself
+                if not (model == self.__class__ and pk == self.pk):
+                    referrers.append((model, pk, field.name))
+        return referrers
+
+    @classmethod
+    def _get_referring_fields(cls):
+        """ Returns the list of (model, field) pairs of the foreign keys that can point to this
+            class, including foreign keys to the classes it inherits from
+        """
+        if cls not in _referring_fields_by_class:
+            registry = get_reverse_foreign_key_registry()
+            referring_fields = []
+            for base_class in inspect.getmro(cls):
+                referring_fields += registry.get(base_class, [])
+            _referring_fields_by_class[cls] = referring_fields
+        return _referring_fields_by_class[cls]
+
+    @classmethod
+    def _get_status_children(cls):
+        """ Returns the list of (child model, field name) pairs of the models that inherit their
+            status from this class, or from one of the classes it inherits from, through that field
+        """
+        if cls not in _status_children_by_class:
+            registry = get_status_inheritance_registry()
+            status_children = []
+            for base_class in inspect.getmro(cls):
+                status_children += registry.get(base_class, [])
+            _status_children_by_class[cls] = status_children
+        return _status_children_by_class[cls]
+
+    def _get_update_kwarg(self, field_name, value):
+        """ Returns a (name, value) pair for field_name that can be passed to QuerySet.update()
+
+            field_name may be either a field's name or its attname (i.e. 'team' or 'team_id'),
+            and value may be either an object or its id.
+        """
+        for field in self._meta.fields:
+            if field_name in (field.name, field.attname):
+                if isinstance(field, models.ForeignKey) and isinstance(value, models.Model):
+                    value = value.pk
+                return (field.name, value)
+        return (field_name, value)
+
+    def _has_perm(self, user, perm):
+        """ Does the permission check of has_perm() without the cache """
+        try:
+            if perm == 'can_view': 
+                if (self.status == self.LIVE) or \
+                   ((self.status == self.HIDDEN) and self._is_submitted_by(user)):
+                    return True
+                elif self.status == self.REMOVED:
+                    return False
+            else: # For all other permission types (i.e. edit, remove, approve, reject)
+                if self._is_submitted_by(user):
+                    return True
+        except:
+            pass
+        
+        if self.has_special_restriction(user, perm):
+            return self.has_special_perm(user, perm)
+        else:
+            return user.has_perm(perm) or self.has_special_perm(user, perm)
+
+    def _has_tracked_changes(self):
+        """ Returns True iff a field other than the untracked_field_names changed since this object
+            was loaded or last saved
+        """
+        untracked_attnames = set([self._meta.get_field(name).attname for name in self.untracked_field_names])
+        return bool(set(self.get_dirty_fields()) - untracked_attnames)
+
+    @classmethod
+    def _iter_objs_from_referrers(cls, referrers, chunk_size=500):
+        """ Yields the objects referred to by a list of (model, pk, field name) tuples from
+            _get_referrers(), loading them chunk_size objects at a time.
+
+            Each object is only yielded once, even if several of its foreign keys are in the list.
+            Objects that no longer exist by the time their chunk is loaded
+            are skipped.
+        """
+        pks_by_model = {}
+        for model, pk, field_name in referrers:
+            pks = pks_by_model.setdefault(model, [])
+            if pk not in pks:
+                pks.append(pk)
+
+        for model, pks in pks_by_model.items():
+            for start in range(0, len(pks), chunk_size):
+                for obj in model._default_manager.filter(pk__in=pks[start:start + chunk_size]):
+                    yield obj
+
     def _is_changed_to_live(self):
         """ Returns True iff the object has been changed from some other status to live since it was instantiated """
         return (self._original_status and self._original_status != self.LIVE and self.status == self.LIVE)
@@ -1206,6 +3099,97 @@ class TrackableObject(models.Model):
         """ Returns True iff the object has been changed from hidden to live since it was instantiated """
         return (self._original_status == self.HIDDEN and self.status == self.LIVE)
 
+    def _is_submitted_by(self, user):
+        """ Returns True iff user submitted this object, without loading submitted_by """
+        return self.submitted_by_id is not None and getattr(user, 'pk', None) == self.submitted_by_id
+
+    def _lock_for_merge(self, objs):
+        """ Locks this object, objs and the objects that point to objs until the end of the
+            transaction, and returns the (model, pk, field name) referrers of objs.
+
+            The rows, and the revisions that point to them, are locked with one lock_objects()
+            call, so merges and edits of other families of objects can run at the same time
+            without deadlocking. The referrers are looked up again once the rows are locked. If
+            a referrer was saved in between, RetryTransaction is raised instead of locking it out
+            of order, so that run_in_transaction() runs the merge again.
+        """
+        def get_referrers():
+            referrers = []
+            for obj in objs:
+                referrers += obj._get_referrers()
+            return referrers
+
+        referrers = get_referrers()
+        lock_objects([(self.__class__, obj.id) for obj in [self] + objs] + \
+                     [(model, pk) for model, pk, field_name in referrers], with_prev=True)
+
+        if set(get_referrers()) - set(referrers):
+            raise RetryTransaction('Objects started pointing to the merged objects while they were being locked.')
+        return referrers
+
+    def _merge_objs(self, objs, request, message, merge_event=None):
+        """ Merges the objects themselves for merge_many(), and returns the merged object.
+            The objects that point to objs are not changed.
+
+            If merge_event is not given, a new MergeEvent is created. The merged object's
+            merge_event is the one that was used.
+        """
+        # copy the primary object (self) to be merged
+        self._claim_version()
+        old_self = self._copy_obj(self)
+
+        # loop over every field on the object, setting the field to the first secondary
+        # object's value iff that object has a value defined on the field and self doesn't.
+        # The fields that track revisions and merges stay as they are
+        field_dict = self.__dict__
+        for obj in objs:
+            for field in field_dict:
+                if not field.startswith('_') and \
+                   field not in self.merge_bookkeeping_fields and \
+                   (not self.__getattribute__(field) and obj.__getattribute__(field)):
+                    self.__setattr__(field, obj.__getattribute__(field))
+
+        # create a copy of each secondary object, and make the head object point to 
+        # the primary object (self)
+        for obj in objs:
+            obj.is_head = False
+            obj.points_to_id = self.id
+            obj.edit(request=request, message=message, force=True, do_after_saved=True)
+
+        # Create a new merge event, or record the secondary objects on the one given. A merge
+        # event that already has them is shared with the merge that caused this one
+        if not merge_event:
+            merge_event = MergeEvent()
+        if not merge_event.secondary_ids:
+            merge_event.content_type_id = self.real_type_id
+            merge_event.secondary_ids = ','.join([str(obj.id) for obj in objs])
+            merge_event.save()
+
+        # save this object along with relevant merge data
+        self.merge_event = merge_event
+        self.points_to_id = None
+        self.is_head = True
+        self.action_taken = self.MERGED
+        self.action_time = datetime.now()
+        if request and request.user:
+            self.action_by = request.user 
+        self.revision = old_self.revision + 1
+        self.primary_merge_from_id = old_self.id
+        self.secondary_merge_from_id = objs[0].id
+        self.latest_merge_event = merge_event
+        if self.merge_lineage is not None or self.head_id is not None:
+            self.merge_lineage = ','.join(self.get_merge_lineage() + [str(merge_event.id)])
+        for obj in objs:
+            self = self.merge_fields(request, obj, old_self)
+        self.save()
+        self._sync_permission_grants([self])
+        return self
+
+    @classmethod
+    def _overrides(cls, method_name):
+        """ Returns True iff this class overrides the TrackableObject method named method_name """
+        return getattr(cls, method_name).im_func is not getattr(TrackableObject, method_name).im_func
+
     def _parent_is_hidden(self):
         """ If the object has a parent and it is hidden, this returns True. Otherwise it returns False """
         parent = self._get_parent()
@@ -1213,7 +3197,7 @@ class TrackableObject(models.Model):
             return parent.is_hidden()
         return False
 
-    def _perform_action(self, request, action):
+    def _perform_action(self, request, action, version_claimed=False):
         """ Called to perform a create/edit/remove action.
 
             This method creates a copy of the object and saves the appropriate data to the model.
@@ -1223,26 +3207,164 @@ class TrackableObject(models.Model):
             Args:
                 request
                 action - the ID of the action. e.g. self.CREATED, self.EDITED, self.REMOVED
+                version_claimed (optional) - True if the caller already called
+                                             _lock_and_claim_version() in the same transaction
         """
-        # If the object exists (i.e. if it is not just being created now)
-        if self.id:
-            # Make a full copy of this object as it existed before the changes were made
-            obj = self.__class__.all_objects.get(id=self.id)
-            self._copy_obj(obj)
-
-        self._reset_merge_fields(save=False)
-        now = datetime.now()
-        self.action_by = request.user
-        self.action_time = now
-        self.action_taken = action
-        self.cache_time = now
-        self.save()
+        with commit_on_success_unless_managed():
+            # If the object exists (i.e. if it is not just being created now)
+            if self.id:
+                # Lock the head object first, and make a full copy of it as it was before the
+                # changes were made. The claimed version proves that the values it was loaded with
+                # are still the ones in the database, so they are copied without reading the row
+                # again. _copy_obj() then locks the revisions that point to it, which nobody
+                # changes without holding this lock
+                if not version_claimed:
+                    self._lock_and_claim_version()
+                obj = self._get_original_obj()
+                old_obj = self._copy_obj(obj, newer=self)
+                self.head_id = old_obj.head_id
+                self.revision = old_obj.revision + 1
+
+            self._reset_merge_fields(save=False)
+            now = datetime.now()
+            self.action_by = request.user
+            self.action_time = now
+            self.action_taken = action
+            self.cache_time = now
+            self.save()
+            self._sync_permission_grants([self])
 
     def _remove_affected_by_merge(self, merge_event):
         affected_by_merge = self._get_affected_by_merge(merge_event=merge_event)
         if affected_by_merge:
             affected_by_merge.delete()
 
+    def _remove_from_merge_lineage(self, merge_event):
+        """ Takes merge_event out of this object's merge lineage, and points latest_merge_event at
+            the merge before it. The object is not saved.
+        """
+        if self.merge_lineage is None and self.head_id is None:
+            # The merges of objects from before head_id existed are still found by searching
+            return
+        merge_lineage = [id for id in self.get_merge_lineage() if id != str(merge_event.id)]
+        self.merge_lineage = ','.join(merge_lineage)
+        if merge_lineage:
+            self.latest_merge_event_id = int(merge_lineage[-1])
+        else:
+            self.latest_merge_event = None
+
+    def _resolve_merge_conflicts(self, conflicts, request, message, merge_event, do_after_saved):
+        """ Merges each referring object from _rewrite_referrers() that would have conflicted with
+            another object into that object. A referring object that is no longer a head object,
+            because an earlier merge already got rid of it, is skipped.
+
+            Args:
+                conflicts - a list of (referring object, conflicting object) pairs
+        """
+        for pointing_obj, conflicting_obj in conflicts:
+            # Re-fetch both objects, since an earlier merge may have changed them
+            try:
+                pointing_obj = pointing_obj.__class__.objects.get(id=pointing_obj.id)
+                conflicting_obj = conflicting_obj.__class__.objects.get(id=conflicting_obj.id)
+            except ObjectDoesNotExist:
+                continue
+
+            # If the rewritten object would conflict with others, get rid of this object
+            # by merging it into the first conflicting object
+            conflicting_obj.merge(pointing_obj, force=True, merge_event=merge_event,
+                                  request=request, message=message,
+                                  do_after_saved=do_after_saved)
+
+            # Mark this conflicting object as affected by the merge so it will be unmerged
+            # automatically if this object is unmerged later
+            AffectedByMerge.objects.create(merge_event, conflicting_obj)
+
+    def _restore_affected_by_merge(self, affected_by_merge_list, merge_event, secondary_ids, head_before_merge_id,
+                                   request, message):
+        """ Undoes what merge_event did to the objects recorded by affected_by_merge_list, after
+            _unmerge_objs() restored this object and the objects merged into it, and deletes the
+            records that were undone.
+
+            The foreign keys of objects without revisions are pointed back with one UPDATE per
+            foreign key and secondary object, for those that still point to this object. The
+            TrackableObjects are loaded with one query per model and restored one by one.
+
+            Args:
+                affected_by_merge_list - AffectedByMerge objects of merge_event
+                secondary_ids - the ids of the objects merge_event merged into this object
+                head_before_merge_id - the id of the head object this object had before the merge
+        """
+        affected_by_merge_list = list(affected_by_merge_list)
+        ids_by_foreign_key = {}
+        restored_affected_by_merge_ids = []
+        for affected_by_merge in affected_by_merge_list:
+            if affected_by_merge.field_name and affected_by_merge.previous_object_id in secondary_ids:
+                model = ContentType.objects.get_for_id(affected_by_merge.content_type_id).model_class()
+                if issubclass(self.__class__, model._meta.get_field(affected_by_merge.field_name).rel.to):
+                    key = (model, affected_by_merge.field_name, affected_by_merge.previous_object_id)
+                    ids_by_foreign_key.setdefault(key, []).append(affected_by_merge.object_id)
+                    restored_affected_by_merge_ids.append(affected_by_merge.id)
+        for (model, field_name, previous_object_id), ids in ids_by_foreign_key.items():
+            for start in range(0, len(ids), 500):
+                model._default_manager.filter(pk__in=ids[start:start + 500], **{field_name: self.id}) \
+                                      .update(**{field_name: previous_object_id})
+        affected_by_merge_list = [affected_by_merge for affected_by_merge in affected_by_merge_list
+                                  if not affected_by_merge.field_name]
+
+        # Load all other objects that were affected by this merge, with one query per model
+        ids_by_content_type_id = {}
+        for affected_by_merge in affected_by_merge_list:
+            ids_by_content_type_id.setdefault(affected_by_merge.content_type_id, []).append(affected_by_merge.object_id)
+        objs_by_key = {}
+        for content_type_id, ids in ids_by_content_type_id.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            for affected_obj in model.all_objects.filter_revisions(id__in=ids):
+                objs_by_key[(content_type_id, affected_obj.id)] = affected_obj
+
+        # Restore all other objects that were affected by this merge
+        for affected_by_merge in affected_by_merge_list:
+            affected_obj = objs_by_key.get((affected_by_merge.content_type_id, affected_by_merge.object_id))
+            if affected_obj is None:
+                continue
+            affected_obj = affected_obj.rebuild()
+
+            # Unmerge any objects that had been merged recursively
+            if affected_obj.merge_event == merge_event:
+                affected_obj._get_head().unmerge(merge_event=merge_event, request=request, 
+                                                 message=message, force=True,
+                                                 do_after_saved=False)
+
+            # Fix any objects that modified one of their foreign keys due to the merge
+            else:
+                # The foreign keys that pointed to this unmerged object because of the merge
+                # and still point to it
+                affected_obj_head = affected_obj._get_head()
+                fields = [field for field in affected_obj._meta.fields
+                          if isinstance(field, models.ForeignKey) and \
+                             issubclass(self.__class__, field.rel.to) and \
+                             getattr(affected_obj_head, field.attname) == self.id and \
+                             getattr(affected_obj, field.attname) == head_before_merge_id]
+
+                # If this affected object's previous object used to point to a secondary
+                # object instead of obj_1, then reset this pointer to that secondary object
+                restored_foreign_keys = {}
+                if fields:
+                    for previous_affected_obj in affected_obj._get_prev():
+                        previous_affected_obj = previous_affected_obj.rebuild()
+                        for field in fields:
+                            if getattr(previous_affected_obj, field.attname) in secondary_ids:
+                                secondary_id = getattr(previous_affected_obj, field.attname)
+                                setattr(affected_obj, field.attname, secondary_id)
+                                # Also set all objects this object points to to the secondary object as well
+                                restored_foreign_keys[field.attname] = (secondary_id, self.id)
+
+                if restored_foreign_keys:
+                    affected_obj.save()
+                    affected_obj._set_all_next_objs_many(restored_foreign_keys, force=True)
+                restored_affected_by_merge_ids.append(affected_by_merge.id)
+
+        AffectedByMerge.objects.filter(id__in=restored_affected_by_merge_ids).delete()
+
     def _reset_merge_fields(self, save=True):
         """ Resets all fields dealing with merges to None. If save is True, it saves the object as well """
         self.merge_event = None
@@ -1266,19 +3388,175 @@ class TrackableObject(models.Model):
                         all next objects no matter what
 
         """
-        prev = self 
-        next = self.points_to
-        while True:
-            valid_value = False
-            # It is valid as long as the expected value is found
-            if force or (next and getattr(next, field_name) == expected_value):
-                valid_value = True
-            if next is None or not valid_value:
-                break
-            setattr(next, field_name, value)
-            next.save()
-            prev = next
-            next = next.points_to
+        self._set_all_next_objs_many({field_name: (value, expected_value)}, force=force)
+
+    def _set_all_next_objs_many(self, updates, force=False):
+        """ The version of _set_all_next_objs() for several fields at once.
+
+            The next objects are loaded once, and the fields that stop at the same object are
+            set with a single UPDATE over the ids of the objects before it.
+
+            Args:
+                updates - a dict of field name: (value, expected_value)
+                force - if True, it ignores the expected values and executes the updates for 
+                        all next objects no matter what
+        """
+        if not updates:
+            return
+        next_objs = self._get_next_objs()
+        stored_next_objs = [copy.copy(next) for next in next_objs]
+        self._fill_delta_fields(next_objs)
+
+        # Group the fields by how many of the next objects they are set on
+        updates_by_count = {}
+        for field_name, (value, expected_value) in updates.items():
+            count = 0
+            for next in next_objs:
+                # It is valid as long as the expected value is found
+                if not (force or getattr(next, field_name) == expected_value):
+                    break
+                count += 1
+            if count:
+                updates_by_count.setdefault(count, []).append(self._get_update_kwarg(field_name, value))
+
+        for count, update_kwargs in updates_by_count.items():
+            ids_to_update = [next.id for next in next_objs[:count]]
+            last_stored_obj = stored_next_objs[count - 1]
+            update_kwargs = dict(update_kwargs)
+            update_kwargs['cache_time'] = datetime.now()
+            self.__class__.all_objects.update_revisions(ids_to_update, **update_kwargs)
+
+            # The revision after the last one updated no longer has the same values, so a
+            # delta-encoded revision has to start storing these fields itself
+            if last_stored_obj.delta_fields is not None:
+                delta_fields = filter(None, last_stored_obj.delta_fields.split(','))
+                missing_attnames = [self._meta.get_field(update_name).attname for update_name in update_kwargs
+                                    if update_name != 'cache_time' and \
+                                       self._meta.get_field(update_name).attname not in delta_fields]
+                if missing_attnames:
+                    self.__class__.all_objects.update_revisions([last_stored_obj.id],
+                                                                delta_fields=','.join(delta_fields + missing_attnames))
+
+    def _rewrite_referrers(self, objs, referrers, request, message, merge_event):
+        """ Makes the foreign keys in referrers that pointed to one of objs point to this object
+            instead, after objs were merged into this object.
+
+            The referring TrackableObjects are rewritten in bulk, for each model and set of foreign
+            keys that pointed to objs: one bulk insert of revisions, one UPDATE and one bulk insert
+            of AffectedByMerge objects per 500 objects. A referring object that would conflict with
+            another object once it is rewritten, including another referring object that is
+            rewritten before it, is left as it is, and returned in a list of (referring object,
+            conflicting object) pairs for _resolve_merge_conflicts(). Referring models whose
+            get_conflicts() cannot be checked in bulk are checked and rewritten one at a time. Other
+            referring models are rewritten with one UPDATE per foreign key, and recorded with
+            AffectedByMerge.objects.create_many_for_field() so unmerge() can point them back.
+
+            A referrer that no longer points to one of objs is skipped, so rewriting the same
+            referrers again is harmless.
+
+            Args:
+                objs - the objects that were merged into this object
+                referrers - the (model, pk, field name) tuples from _get_referrers() of each of
+                            objs, taken before the merge
+        """
+        obj_ids = set([obj.id for obj in objs])
+        field_names_by_model = {}
+        for model, pk, field_name in referrers:
+            field_names_by_model.setdefault(model, set()).add(field_name)
+
+        for model, field_names in field_names_by_model.items():
+            if not issubclass(model, TrackableObject):
+                for field_name in field_names:
+                    queryset = model._default_manager.filter(**{field_name + '__in': list(obj_ids)})
+                    rows = list(queryset.values_list('pk', model._meta.get_field(field_name).attname))
+                    AffectedByMerge.objects.create_many_for_field(merge_event, model, field_name, rows)
+                    queryset.update(**{field_name: self})
+
+        # Rewrite the referrers in memory, and plan the merges of the ones that would conflict
+        rewritten_by_model = {}
+        tracked_referrers = [referrer for referrer in referrers if issubclass(referrer[0], TrackableObject)]
+        for pointing_obj in self._iter_objs_from_referrers(tracked_referrers):
+            model = pointing_obj.__class__
+            if model == self.__class__ and (pointing_obj.id == self.id or pointing_obj.id in obj_ids):
+                continue
+
+            # Find the foreign keys that still point to one of objs
+            field_names = tuple(sorted([field_name for field_name in field_names_by_model[model]
+                                        if getattr(pointing_obj, model._meta.get_field(field_name).attname) in obj_ids]))
+            if not field_names:
+                continue
+
+            # Notice that pointing_obj.merge_event is not set. We leave it as None
+            # because only objects that are the result of an object being merged into
+            # it have the merge_event field set to anything besides None
+            rewritten_obj = copy.copy(pointing_obj)
+            for field_name in field_names:
+                setattr(rewritten_obj, model._meta.get_field(field_name).attname, self.id)
+            rewritten_by_model.setdefault(model, []).append((pointing_obj, rewritten_obj, field_names))
+
+        def rewrite(model, field_names, objs):
+            updates = dict([(field_name, self.id) for field_name in field_names])
+            for start in range(0, len(objs), 500):
+                chunk = objs[start:start + 500]
+                model._bulk_perform_action(chunk, request, model.EDITED, updates)
+                AffectedByMerge.objects.create_many(merge_event, chunk)
+
+        objs_by_group = {}
+        conflicts = []
+        for model, rewritten in rewritten_by_model.items():
+            if not model._checks_conflicts_in_bulk():
+                # Each referrer is written before the next one is checked, so that get_conflicts()
+                # finds it
+                for pointing_obj, rewritten_obj, field_names in rewritten:
+                    conflicting_objects = rewritten_obj.get_conflicts()
+                    if conflicting_objects:
+                        conflicts.append((pointing_obj, conflicting_objects[0]))
+                    else:
+                        rewrite(model, field_names, [pointing_obj])
+                        objs_by_group.setdefault((model, field_names), []).append(pointing_obj)
+                continue
+
+            # All of the model's referrers are checked together, so a referrer also conflicts with
+            # the ones before it that would share its values once rewritten. The first of those
+            # is rewritten and the rest are merged into it. A rewritten referrer that is left as it
+            # is because of its own conflicts does not conflict with the ones after it
+            conflicts_by_obj = model.get_conflicts_bulk([rewritten_obj for pointing_obj, rewritten_obj, field_names in rewritten])
+            skipped = set()
+            for (pointing_obj, rewritten_obj, field_names), conflicting_objects in zip(rewritten, conflicts_by_obj):
+                conflicting_objects = [obj for obj in conflicting_objects if id(obj) not in skipped]
+                if conflicting_objects:
+                    conflicts.append((pointing_obj, conflicting_objects[0]))
+                    skipped.add(id(rewritten_obj))
+                else:
+                    objs_by_group.setdefault((model, field_names), []).append(pointing_obj)
+
+        for (model, field_names), objs in objs_by_group.items():
+            if model._checks_conflicts_in_bulk():
+                rewrite(model, field_names, objs)
+            send_bulk_signals(post_bulk_update, post_update, model, objs, request, message)
+        return conflicts
+
+    def _save_fields(self, using=None):
+        """ Writes only the fields that changed to the database with a single UPDATE.
+
+            pre_save and post_save are sent just like they are for save(). Each field that is
+            written goes through its pre_save() like it does in save(), so auto_now fields are
+            refreshed and files are committed to storage.
+        """
+        using = using or self._state.db
+        signals.pre_save.send(sender=self.__class__, instance=self, raw=False, using=using)
+
+        # Look for changes after pre_save in case a receiver changed any fields
+        attnames = set(self.get_dirty_fields())
+        update_kwargs = dict([(field.name, field.pre_save(self, False))
+                              for field in self._meta.fields
+                              if field.attname in attnames or getattr(field, 'auto_now', False)])
+        if not self.__class__._base_manager.using(using).filter(pk=self.pk).update(**update_kwargs):
+            # The row is gone, so write the whole object again
+            super(TrackableObject, self).save(using=using)
+            return
+
+        signals.post_save.send(sender=self.__class__, instance=self, created=False, raw=False, using=using)
 
     def _set_submit_params(self, request, message=''):
         """ If the default submit parameters are not yet set, it sets these based off of the request and submission message.
@@ -1292,23 +3570,124 @@ class TrackableObject(models.Model):
             self.submission_message = message
         return self
 
+    @classmethod
+    def _sync_permission_grants(cls, objs):
+        """ Rewrites the PermissionGrant rows of the head objects in objs with one DELETE and one
+            bulk insert. Does nothing unless the class sets use_permission_grants.
+        """
+        if not cls.use_permission_grants or not objs:
+            return
+        content_type = ContentType.objects.get_for_model(cls)
+        ids = [obj.id for obj in objs]
+        grants = []
+        for obj in objs:
+            if not obj.is_head:
+                continue
+            for is_restriction, entries in ((False, obj.get_permission_grants()),
+                                            (True, obj.get_permission_restrictions())):
+                for principal, perm in entries:
+                    grants.append(PermissionGrant(user=principal if isinstance(principal, User) else None,
+                                                  group=principal if isinstance(principal, Group) else None,
+                                                  content_type=content_type,
+                                                  object_id=obj.id,
+                                                  perm=perm,
+                                                  is_restriction=is_restriction))
+        with commit_on_success_unless_managed():
+            for start in range(0, len(ids), 500):
+                PermissionGrant.objects.filter(content_type=content_type, object_id__in=ids[start:start + 500]).delete()
+            PermissionGrant.objects.bulk_create(grants)
+
+    def _unmerge_objs(self, obj_to_unmerge, obj_to_unmerge_is_self, merge_event):
+        """ Unmerges the objects themselves for unmerge(): restores the fields obj_to_unmerge took
+            from the objects merge_event merged into it, and makes those objects head objects again.
+            The objects that were affected by the merge are not changed.
+
+            Returns the restored secondary objects, in priority order, and the head object
+            obj_to_unmerge had before the merge.
+        """
+        # The objects that were merged into obj_to_unmerge, in priority order
+        secondary_ids = merge_event.get_secondary_ids(obj_to_unmerge)
+        secondaries_by_id = dict([(secondary.id, secondary) for secondary in
+                                  self.__class__.all_objects.filter_revisions(id__in=secondary_ids)])
+        secondaries = [secondaries_by_id[id] for id in secondary_ids]
+
+        # loop over every field on the object, resetting the field on the first object
+        # to how it was if it had been set by one of the secondary objects originally.
+        # The fields are compared by attname so that foreign keys are not loaded
+        primary_merge_from = obj_to_unmerge.primary_merge_from
+        restored_fields = {}
+        for field in obj_to_unmerge._meta.fields:
+            if field.name.startswith('_') or field.attname in self.merge_bookkeeping_fields:
+                continue
+            old_obj_1_field = getattr(primary_merge_from, field.attname)
+            obj_1_field = getattr(self, field.attname) # Get self's field because it may have changed
+                                                       # since the merge happened and we want to 
+                                                       # compare the most recent value
+            # The value was taken from the first secondary object that had one
+            obj_2_field = None
+            for secondary in secondaries:
+                if getattr(secondary, field.attname):
+                    obj_2_field = getattr(secondary, field.attname)
+                    break
+            if (old_obj_1_field == None or old_obj_1_field == '' or old_obj_1_field == 0) and \
+               obj_2_field and \
+               obj_2_field == obj_1_field:
+                setattr(obj_to_unmerge, field.attname, old_obj_1_field)
+                restored_fields[field.attname] = (old_obj_1_field, obj_1_field)
+
+        # Primary_merge_from and secondary_merge_from are left as is, so we know which two objects
+        # the unmerge came from
+        obj_to_unmerge.merge_event = None
+        obj_to_unmerge.action_taken = self.UNMERGED
+        # obj_to_unmerge is NOT marked as head because it is not necessarily the head object that is being 
+        # unmerged. There are cases when an object that has later been edited and merged
+        # needs to be unmerged from a previous state to reproduce the secondary object as it existed back then
+        self._remove_from_merge_lineage(merge_event)
+        obj_to_unmerge.save()
+        obj_to_unmerge._set_all_next_objs_many(restored_fields)
+        if not obj_to_unmerge_is_self:
+            self.save()
+        self._sync_permission_grants([self])
+
+        # Restore the secondary objects to exactly how they were before the original merge happened
+        for secondary in secondaries:
+            secondary.is_head = True
+            secondary.points_to_id = None
+            secondary.save()
+        # The merge dropped the grants of the secondary objects when they stopped being head
+        self._sync_permission_grants(secondaries)
+
+        return secondaries, obj_to_unmerge._get_head_before_merge()
+
     def _update_cache_time(self, async=True):
         self.cache_time = datetime.now()
 
     def _update_child_statuses(self, request, status, child_status_kwargs=None, action='edit', message='', do_after_saved=True, force=False, async=True):
-        """ Updates the statuses of any child objects that were pointing to this object """
-        from trackable_object.tasks import update_child_statuses
-        kwargs = {'status': status,
-                  'user_id': request.user.id,
-                  'child_status_kwargs': child_status_kwargs,
-                  'action': action,
-                  'message': message,
-                  'do_after_saved': do_after_saved,
-                  'force': force}
+        """ Updates the statuses of any child objects that were pointing to this object.
+
+            If async is True, the children are updated by a CascadeJob, which is returned.
+        """
+        return self._update_children_statuses([self], request, status, {self.id: child_status_kwargs}, action=action,
+                                              message=message, do_after_saved=do_after_saved, force=force, async=async)
+
+    @classmethod
+    def _update_children_statuses(cls, objs, request, status, child_status_kwargs_by_id, action='edit', message='',
+                                  do_after_saved=True, force=False, async=True):
+        """ Updates the statuses of the child objects of all of objs in a single job
+
+            If async is True, the children are updated by a CascadeJob, which is returned.
+            Nothing is done if no model inherits its status from this class.
+
+            Args:
+                child_status_kwargs_by_id - a dict of object id: the status kwargs to find that
+                                            object's children with
+        """
+        if not cls._get_status_children():
+            return None
+        parents = [(obj, child_status_kwargs_by_id[obj.id]) for obj in objs]
         if async:
-            update_child_statuses.delay(self, **kwargs)
-        else:
-            update_child_statuses(self, **kwargs)
+            return CascadeJob.objects.start(parents, request, status, action=action, message=message, force=force)
+        cascade_status(parents, request, status, action=action, message=message, force=force)
 
     def _update_foreign_key_cache_time(self):
         """ DEPRECATED Updates the cache times for all the foreign keys for this object recursively """
@@ -1332,6 +3711,117 @@ class TrackableObject(models.Model):
 
     # Extra queryset methods.
     class QuerySet(QuerySet):
+        def edit_all(self, request, message='', force=False, **field_updates):
+            """ Edits every head object in the queryset and records a full history of the action.
+
+                This is the bulk version of edit(). The revisions of all the objects are written
+                with one bulk insert, and the updates are applied with a single UPDATE, instead of
+                several queries per object. Objects the user may not edit and objects the update
+                would not change are skipped. The children of the objects that went live are
+                updated by a single background job. post_bulk_update is sent once, and
+                post_update for each object if anything receives it. Returns the list of edited
+                objects.
+
+                Usage:
+                    Game.objects.filter(season=season).edit_all(request, 'Fixed the start times', start_time=start_time)
+
+                Args:
+                    request
+                    message - an optional message describing why the edit occurred
+                    force - If True, the objects are edited regardless of the user's permissions
+                    field_updates - the values to set, by field name
+            """
+            model = self.model
+            new_status = field_updates.get('status', None)
+            objs = []
+            for obj in self.filter(is_head=True):
+                update_attnames = dict([(model._meta.get_field(name).attname, value)
+                                        for name, value in [obj._get_update_kwarg(name, value)
+                                                            for name, value in field_updates.items()]])
+                if not [attname for attname, value in update_attnames.items() if getattr(obj, attname) != value]:
+                    continue
+                if not force and \
+                   not (obj.has_edit_perm(request.user) and \
+                        (new_status is None or new_status == obj.status or \
+                         (obj.status == model.HIDDEN and new_status == model.LIVE))):
+                    continue
+                objs.append(obj)
+            if not objs:
+                return objs
+
+            original_statuses = dict([(obj.id, obj.status) for obj in objs])
+            with commit_on_success_unless_managed(using=self.db):
+                model._bulk_perform_action(objs, request, model.EDITED, field_updates)
+
+            # The children of every object that went live are updated by a single job
+            live_objs = []
+            child_status_kwargs_by_id = {}
+            for obj in objs:
+                obj._original_status = original_statuses[obj.id]
+                if obj._is_changed_to_live():
+                    live_objs.append(obj)
+                    child_status_kwargs_by_id[obj.id] = model.objects.get_status_kwargs([obj._original_status])
+            if live_objs:
+                model._update_children_statuses(live_objs, request, status=model.LIVE,
+                                                child_status_kwargs_by_id=child_status_kwargs_by_id,
+                                                action='edit', message=message, force=force)
+
+            for obj in objs:
+                if obj._is_hidden_to_live() and model._overrides('do_if_live'):
+                    obj.do_if_live(request, message)
+                if model._overrides('do_after_saved'):
+                    obj.do_after_saved(request, message)
+                obj._original_status = obj.status
+
+            send_bulk_signals(post_bulk_update, post_update, model, objs, request, message)
+            return objs
+
+        def remove_all(self, request, message='', force=False, async=True):
+            """ Removes every head object in the queryset in a single transaction.
+
+                This is the bulk version of remove(). The revisions of all the objects are written
+                with one bulk insert, and the status change is applied with a single UPDATE. The
+                children of all the removed objects are updated by a single background job, and
+                post_bulk_remove is sent once, and post_remove for each object if anything receives
+                it. Objects the user may not remove and objects that are already removed are
+                skipped. Returns the list of removed objects.
+
+                Args:
+                    request
+                    message - an optional message describing why the objects were removed
+                    force - If True, the objects are removed regardless of the user's permissions
+                    async - If True, the children are updated in the background
+            """
+            model = self.model
+            objs = [obj for obj in self.filter(is_head=True).exclude(status=model.REMOVED)
+                    if force or obj.has_remove_perm(request.user)]
+            if not objs:
+                return objs
+
+            child_status_kwargs_by_id = dict([(obj.id, obj.get_status_kwargs()) for obj in objs])
+            updates = {'status': model.REMOVED,
+                       'removed_by': request.user,
+                       'removed_time': datetime.now(),
+                       'removal_message': message}
+            with commit_on_success_unless_managed(using=self.db):
+                if model._overrides('remove_related'):
+                    for obj in objs:
+                        obj.remove_related(request, message)
+                model._bulk_perform_action(objs, request, model.REMOVED, updates)
+
+            model._update_children_statuses(objs, request, status=model.REMOVED,
+                                            child_status_kwargs_by_id=child_status_kwargs_by_id,
+                                            action='remove', force=force, async=async)
+            for obj in objs:
+                obj._original_status = obj.status
+                if model._overrides('do_if_removed'):
+                    obj.do_if_removed(request, message)
+                if model._overrides('do_after_saved'):
+                    obj.do_after_saved(request, message)
+
+            send_bulk_signals(post_bulk_remove, post_remove, model, objs, request, message)
+            return objs
+
         def filter_edit_perms(self, user, object=None):
             return self.filter_perms(user, 'trackable_object.change_trackableobject', object)
 
@@ -1339,10 +3829,15 @@ class TrackableObject(models.Model):
             """
             The object parameter is an object that a user may have special permissions on.
             If a user has special permissions on this object, then the original queryset will be returned.
+
+            If the model sets use_permission_grants, the special permissions and restrictions in
+            the PermissionGrant table are applied in the same query.
             """
-            if user.has_perm(perm):
+            if object and object.has_perm(user, perm):
                 return self
-            elif object and object.has_perm(user, perm):
+            elif self.model.use_permission_grants:
+                return self._filter_perms_with_grants(user, perm)
+            elif user.has_perm(perm):
                 return self
             else:
                 if perm == "can_view":
@@ -1364,6 +3859,22 @@ class TrackableObject(models.Model):
             """
             return self.exclude(status=self.model.REMOVED).filter_perms(user, 'can_view', object)
 
+        def _filter_perms_with_grants(self, user, perm):
+            """ The filter_perms() for models that set use_permission_grants. This follows the
+                order of the checks in TrackableObject.has_perm()
+            """
+            grants = PermissionGrant.objects.for_user(user, self.model, perm)
+            allowed = Q(id__in=grants.filter(is_restriction=False).values('object_id'))
+            if user.has_perm(perm):
+                allowed |= ~Q(id__in=grants.filter(is_restriction=True).values('object_id'))
+            if perm == "can_view":
+                allowed = Q(status=self.model.LIVE) | (~Q(status=self.model.REMOVED) & allowed)
+                if not user.is_anonymous():
+                    allowed |= Q(status=self.model.HIDDEN, submitted_by=user.id)
+            elif not user.is_anonymous():
+                allowed |= Q(submitted_by=user.id)
+            return self.filter(allowed)
+
         def get_from_id(self, id, select_related='', safe=False):
             """ Looks up an object by its id and returns that object
 
@@ -1441,7 +3952,7 @@ class TrackableObject(models.Model):
                 return True
             elif object and object.has_perm(user, perm):
                 return True
-            elif user.is_authenticated() and 0 < self.filter_perms(user, perm).count():
+            elif user.is_authenticated() and self.filter_perms(user, perm).exists():
                 return True
             else:
                 return False
@@ -1456,6 +3967,20 @@ class TrackableObject(models.Model):
             """
             return self.has_perm(user, 'trackable_object.delete_trackableobject', object)
 
+        def with_perms(self, user, perm_names=('approve', 'edit', 'remove')):
+            """ Evaluates the queryset and returns its objects with what user may do to each of them
+                set on obj.perms, e.g. obj.perms['approve'], using a constant number of queries
+                instead of a few for every object.
+
+                Usage:
+                    scores = GameScore.pending_approval.all().with_perms(request.user, ['approve'])
+
+                Args:
+                    user
+                    perm_names - the permissions to check. See TrackableObject._bulk_has_perms()
+            """
+            return with_perms(list(self), user, perm_names)
+
         def status(self, **kwargs):
             """ Filters the queryset based on the status of the object
 
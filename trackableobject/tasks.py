@@ -1,51 +1,142 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import logging
+import time
 
-from celery.decorators import task
-from django.contrib.auth.models import User
-from django.db import models
+from celery.decorators import periodic_task, task
 
-from trackable_object.utils import fake_request
+from trackable_object.models import CascadeChunk, CascadeJob, MergeEvent, MergeJob, cascade_status
+from trackable_object.utils import actor_request, get_object_ref, get_objects_from_refs
+
+logger = logging.getLogger(__name__)
+
+# The tasks take (content_type_id, pk) references from get_object_ref() instead of model
+# instances, and load the objects when they run. Instances that were queued before the tasks
+# took references are still accepted.
+#
+# Merges and unmerges are run as MergeJobs, so one that is interrupted can be resumed with
+# MergeJob.resume() instead of leaving the objects half merged. resume_stalled_merge_jobs does
+# that for the jobs whose worker died, and resume_stalled_cascade_chunks for lost cascade chunks.
+
+@task()
+def merge_objects(obj_1_ref, obj_2_ref, user_id, message='', force=False, do_after_saved=True, merge_event_id=None,
+                  merge_event=None):
+    """ Merges two trackable objects using the standard trackable_object merge method.
+        Returns a reference to the merged object.
+
+        merge_event is the name merge_event_id had before, and is only kept for tasks that were
+        queued under that name.
+    """
+    if merge_event_id is None:
+        merge_event_id = merge_event
+    obj_1, obj_2 = get_objects_from_refs([obj_1_ref, obj_2_ref])
+    job = MergeJob.objects.start_merge(obj_1, [obj_2], actor_request(user_id), message=message, force=force,
+                                       do_after_saved=do_after_saved, merge_event=_get_merge_event(merge_event_id),
+                                       queue=False)
+    return get_object_ref(job.run().get_object())
+
+
+@task()
+def unmerge_objects(obj_ref, user_id, message='', force=False, do_after_saved=True, merge_event_id=None,
+                    merge_event=None):
+    """ Unmerges a trackable object using the standard trackable_object unmerge method.
+        Returns a reference to the unmerged object.
+
+        merge_event is the name merge_event_id had before, and is only kept for tasks that were
+        queued under that name.
+    """
+    if merge_event_id is None:
+        merge_event_id = merge_event
+    obj = get_objects_from_refs([obj_ref])[0]
+    job = MergeJob.objects.start_unmerge(obj, actor_request(user_id), message=message, force=force,
+                                         do_after_saved=do_after_saved, merge_event=_get_merge_event(merge_event_id),
+                                         queue=False)
+    return get_object_ref(job.run().get_object())
+
+
+@task()
+def update_child_statuses(obj_ref, status, user_id, child_status_kwargs=None, action='edit', message='', do_after_saved=True, force=False):
+    update_children_statuses([(obj_ref, child_status_kwargs)], status, user_id, action=action, message=message,
+                             do_after_saved=do_after_saved, force=force)
 
 
 @task()
-def merge_objects(obj_1, obj_2, user_id, message='', force=False, do_after_saved=True, merge_event=None):
-    """ Merges two trackable objects using the standard trackable_object merge method """
-    user = User.objects.get(id=user_id)
-    request = fake_request(user)
-    return obj_1.merge(obj_2, request, message=message, force=force, do_after_saved=do_after_saved, merge_event=merge_event)
+def update_children_statuses(parents, status, user_id, action='edit', message='', do_after_saved=True, force=False):
+    """ Updates the children of many objects in a single job
+
+        Args:
+            parents - a list of (object reference, child_status_kwargs) pairs
+    """
+    start = time.time()
+    objs = get_objects_from_refs([obj_ref for obj_ref, child_status_kwargs in parents])
+    parents = [(obj, child_status_kwargs) for obj, (obj_ref, child_status_kwargs) in zip(objs, parents)
+               if obj is not None]
+    count = cascade_status(parents, actor_request(user_id), status, action=action, message=message, force=force)
+    logger.info('Updated the statuses of %d children of %d objects to %s (%s) in %.2fs',
+                count, len(parents), status, action, time.time() - start)
+
+
+def _get_merge_event(merge_event_id):
+    """ Returns the MergeEvent with the given id. An instance that was queued before the tasks took
+        ids is returned as it is.
+    """
+    if merge_event_id is None or isinstance(merge_event_id, MergeEvent):
+        return merge_event_id
+    return MergeEvent.objects.get(id=merge_event_id)
 
 
 @task()
-def unmerge_objects(obj, user_id, message='', force=False, do_after_saved=True, merge_event=None):
-    """ Merges two trackable objects using the standard trackable_object merge method """
-    user = User.objects.get(id=user_id)
-    request = fake_request(user)
-    return obj.unmerge(request, message=message, force=force, do_after_saved=do_after_saved, merge_event=merge_event)
+def run_cascade_chunk(chunk_id):
+    """ Runs one chunk of a CascadeJob.
+
+        A chunk can be queued before the transaction that created it commits, so a chunk that
+        cannot be found yet is retried a few times before the task gives up.
+    """
+    start = time.time()
+    try:
+        chunk = CascadeChunk.objects.get(id=chunk_id)
+    except CascadeChunk.DoesNotExist, e:
+        logger.info('Cascade chunk %s does not exist yet, retrying', chunk_id)
+        run_cascade_chunk.retry(args=[chunk_id], exc=e, countdown=5, max_retries=5)
+        return
+    next_chunks = chunk.run()
+    logger.info('Ran cascade chunk %s of job %s (level %s) in %.2fs, queueing %d chunks',
+                chunk.id, chunk.job_id, chunk.level, time.time() - start, len(next_chunks))
 
 
 @task()
-def update_child_statuses(obj, status, user_id, child_status_kwargs=None, action='edit', message='', do_after_saved=True, force=False):
-    user = User.objects.get(id=user_id)
-    request = fake_request(user)
-
-    print obj.__class__
-    print obj.id
-    print status
-    print user_id
-    print action
-
-    if not child_status_kwargs:
-        child_status_kwargs = {}
-    children = obj._get_children(**child_status_kwargs)
-    for child in children:
-        if child.status == status:
-            continue
-
-        child.status = status
-        if action == 'edit':
-            child.edit(request, message=message, do_after_saved=False, force=force, async=False)
-        if action == 'remove':
-            child.remove(request, message=message, do_after_saved=False, force=force, async=False)
+def run_merge_job(job_id):
+    """ Runs the steps of a MergeJob that have not finished.
+
+        A job can be queued before the transaction that created it commits, so a job that
+        cannot be found yet is retried a few times before the task gives up.
+    """
+    start = time.time()
+    try:
+        job = MergeJob.objects.get(id=job_id)
+    except MergeJob.DoesNotExist, e:
+        logger.info('Merge job %s does not exist yet, retrying', job_id)
+        run_merge_job.retry(args=[job_id], exc=e, countdown=5, max_retries=5)
+        return
+    job = job.run()
+    logger.info('Ran merge job %s (%s of %d referrers and %d conflicts) in %.2fs',
+                job.id, job.action, job.referrer_count, job.conflict_count, time.time() - start)
+
+
+@periodic_task(run_every=timedelta(minutes=10))
+def resume_stalled_merge_jobs():
+    """ Queues again the MergeJobs that stopped making progress because their worker died """
+    jobs = MergeJob.objects.resume_stalled()
+    if jobs:
+        logger.warning('Resumed %d stalled merge jobs: %s', len(jobs), ', '.join([str(job.id) for job in jobs]))
+
+
+@periodic_task(run_every=timedelta(minutes=10))
+def resume_stalled_cascade_chunks():
+    """ Queues again the CascadeChunks whose run_cascade_chunk task was lost """
+    chunks = CascadeJob.objects.resume_stalled()
+    if chunks:
+        logger.warning('Resumed %d stalled cascade chunks of jobs %s', len(chunks),
+                       ', '.join(sorted(set([str(chunk.job_id) for chunk in chunks]))))
 
 
 @task()
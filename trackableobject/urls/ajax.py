@@ -1,6 +1,7 @@
 from django.conf.urls.defaults import *
 
-from trackable_object.views import approve_object, reject_object
+from trackable_object.views import approve_object, cascade_job_status, merge_job_status, moderate_objects, \
+        reject_object
 
 def regex():
     return '[a-z_0-9-]+'
@@ -9,6 +10,9 @@ def num_regex():
     return '[0-9]+'
 
 urlpatterns = patterns('',
+    (r'^moderate/$', moderate_objects),
+    (r'^cascades/(?P<job_id>' + num_regex() + r')/$', cascade_job_status),
+    (r'^merges/(?P<job_id>' + num_regex() + r')/$', merge_job_status),
     (r'(?P<app_object_id>' + regex() + r')/approve/$', approve_object),
     (r'(?P<app_object_id>' + regex() + r')/reject/$', reject_object),
 )
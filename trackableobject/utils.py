@@ -1,11 +1,15 @@
+from contextlib import contextmanager
 import re
 import simplejson
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
 from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, transaction
 from django.db.models import get_model
+from django.http import HttpRequest
 from django.test.client import RequestFactory
+from django.utils.functional import SimpleLazyObject
 
 
 def fake_authorized_request(*args, **kwargs):
@@ -40,12 +44,7 @@ def fake_request(user=None, method='GET', data=None, url='/', content_type='text
     request = method(url, content_type=content_type, **kwargs)
 
     # Add the http host
-    host = settings.BASE_URL
-    if host.startswith('https://'):
-        host = host[8:]
-    elif host.startswith('http://'):
-        host = host[7:]
-    request.META['HTTP_HOST'] = host
+    request.META['HTTP_HOST'] = _get_host()
 
     # Add the user to the request
     if user:
@@ -54,6 +53,59 @@ def fake_request(user=None, method='GET', data=None, url='/', content_type='text
         request.user = AnonymousUser()
     return request
 
+def actor_request(user_id=None):
+    """ Returns a lightweight request for code that acts on behalf of a user outside of a real
+        request, such as a task. 
+
+        Unlike fake_request(), this does not build a request with a RequestFactory, and the user
+        is only loaded from the database the first time request.user is used.
+    """
+    request = HttpRequest()
+    request.method = 'GET'
+    request.META['HTTP_HOST'] = _get_host()
+    if user_id:
+        request.user = SimpleLazyObject(lambda: User.objects.get(id=user_id))
+    else:
+        request.user = AnonymousUser()
+    return request
+
+def get_object_ref(obj):
+    """ Returns a (content_type_id, pk) reference to obj that is cheap to send to a task.
+        Use get_objects_from_refs() to load the object again. 
+    """
+    if obj is None:
+        return None
+    return (ContentType.objects.get_for_model(type(obj)).id, obj.pk)
+
+def get_objects_from_refs(refs):
+    """ Loads the objects referred to by a list of references from get_object_ref(), with one
+        query per content type. Returns the objects in the same order, with None for any object
+        that no longer exists.
+
+        TrackableObjects are loaded with all_objects, so objects that are no longer head are
+        found too. Model instances in refs are returned as they are.
+    """
+    pks_by_content_type_id = {}
+    for ref in refs:
+        if isinstance(ref, (list, tuple)):
+            content_type_id, pk = ref
+            pks_by_content_type_id.setdefault(content_type_id, set()).add(pk)
+
+    objs_by_ref = {}
+    for content_type_id, pks in pks_by_content_type_id.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        manager = getattr(model, 'all_objects', model._default_manager)
+        for obj in manager.filter(pk__in=pks):
+            objs_by_ref[(content_type_id, obj.pk)] = obj
+
+    objs = []
+    for ref in refs:
+        if isinstance(ref, (list, tuple)):
+            objs.append(objs_by_ref.get(tuple(ref)))
+        else:
+            objs.append(ref)
+    return objs
+
 def parse_id(app_object_id_string):
     """Takes an object identified by its app, class and id and returns the object
 
@@ -72,6 +124,108 @@ def parse_id(app_object_id_string):
     app_string = tokens[0]
     model_string = tokens[1]
     content_id = int(tokens[2])
-    content_type = ContentType.objects.get(app_label=app_string, model=model_string)
+    content_type = ContentType.objects.get_by_natural_key(app_string, model_string)
     object = content_type.model_class().objects.get(id=content_id)
     return object
+
+def set_history_fields(model):
+    """ Fills in head_id and revision for every revision of model that was saved before those
+        fields existed. Run this once for each TrackableObject model after adding the columns.
+
+        Every family of revisions is walked backwards from its head object. A family head is
+        either a current head object or an object that was merged into another object, and a
+        walk never crosses from one family into another.
+
+        Usage:
+            set_history_fields(Team)
+    """
+    family_head_ids = set(model.objects.values_list('id', flat=True))
+    family_head_ids.update(model.all_objects.exclude(secondary_merge_from_id=None) \
+                                            .values_list('secondary_merge_from_id', flat=True))
+
+    # Load the links of every revision at once, and walk the chains in memory
+    prev_id_by_id = {}
+    for id, points_to_id in model.all_objects.exclude(points_to_id=None).order_by('-id') \
+                                             .values_list('id', 'points_to_id'):
+        if id not in family_head_ids:
+            prev_id_by_id[points_to_id] = id
+
+    ids_by_family_head_id = {}
+    ids_by_revision = {}
+    for family_head_id in family_head_ids:
+        chain = [family_head_id]
+        while chain[-1] in prev_id_by_id:
+            chain.append(prev_id_by_id[chain[-1]])
+        ids_by_family_head_id[family_head_id] = chain
+
+        # The oldest revision is revision 0, and the family head has the highest revision
+        for revision, id in enumerate(reversed(chain)):
+            ids_by_revision.setdefault(revision, []).append(id)
+
+    # One UPDATE per family and per revision number, 500 objects at a time
+    for column, ids_by_value in [('head_id', ids_by_family_head_id), ('revision', ids_by_revision)]:
+        for value, ids in ids_by_value.items():
+            for start in range(0, len(ids), 500):
+                model.all_objects.filter(pk__in=ids[start:start + 500]).update(**{column: value})
+
+def set_permission_grants(model):
+    """ Fills the PermissionGrant table for every head object of model, 500 objects at a time.
+        Run this once after setting use_permission_grants on a model.
+
+        Usage:
+            set_permission_grants(Pool)
+    """
+    ids = list(model.objects.values_list('id', flat=True))
+    for start in range(0, len(ids), 500):
+        model._sync_permission_grants(list(model.objects.filter(pk__in=ids[start:start + 500])))
+
+def _get_host():
+    """ Returns the host of settings.BASE_URL """
+    host = settings.BASE_URL
+    if host.startswith('https://'):
+        host = host[8:]
+    elif host.startswith('http://'):
+        host = host[7:]
+    return host
+
+@contextmanager
+def commit_on_success_unless_managed(using=None):
+    """ Runs the block inside a transaction that is committed if the block succeeds and rolled
+        back if it raises. If a transaction is already being managed, the block just joins it, so
+        an outer transaction is never committed early.
+
+        Usage:
+            with commit_on_success_unless_managed():
+                ...
+    """
+    if transaction.is_managed(using=using):
+        yield
+    else:
+        with transaction.commit_on_success(using=using):
+            yield
+
+class RetryTransaction(Exception):
+    """ Raised inside run_in_transaction() to roll the transaction back and run it again """
+    pass
+
+def run_in_transaction(func, attempts=3, using=None, retry_on=()):
+    """ Calls func() inside a transaction and returns what it returns. If the database rolls the
+        transaction back to break a deadlock, or func raises RetryTransaction or one of the
+        exception classes in retry_on, func is called again in a new transaction, up to attempts
+        times in all.
+
+        func must load what it changes inside the transaction, so that it can be called again.
+        If a transaction is already being managed, func just joins it and is called once, since
+        only the outer transaction could be run again.
+    """
+    if transaction.is_managed(using=using):
+        return func()
+    retryable = (RetryTransaction,) + tuple(retry_on)
+    for attempt in range(attempts):
+        try:
+            with transaction.commit_on_success(using=using):
+                return func()
+        except (DatabaseError,) + retryable, e:
+            if attempt == attempts - 1 or \
+               not (isinstance(e, retryable) or 'deadlock' in unicode(e).lower()):
+                raise
@@ -1,5 +1,7 @@
-from django.contrib.auth.decorators import permission_required
+from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.views import redirect_to_login
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.http import HttpResponse, HttpResponseRedirect
 from django.utils import simplejson
 from django.forms.models import modelformset_factory
@@ -12,7 +14,8 @@ from endless_pagination.decorators import page_template
 from game.models import GameScore
 from trackable_object.forms import RemoveForm, add_edit_message, add_redirect, add_remove_message, \
         add_formset_redirect
-from trackable_object.utils import parse_id
+from trackable_object.models import CascadeJob, MergeJob
+from trackable_object.utils import commit_on_success_unless_managed, parse_id
 
 
 @permission_required('trackable_object.add_trackableobject')
@@ -50,6 +53,101 @@ def reject_object(request, app_object_id):
     response_dict = {'message': message}
     return HttpResponse(simplejson.dumps(response_dict), mimetype='application/json')
 
+def moderate_objects(request):
+    """AJAX method.
+
+    Approves or rejects many objects in one request and one transaction. The body of the POST is
+    a json object with the action and the ids of the objects grouped by app and model:
+        {"action": "approve",
+         "objects": {"game-gamescore": [12, 13, 14]}}
+
+    Each group is fetched with a single query. The response maps the app-model-id string of every
+    object to the outcome for that object:
+        {"results": {"game-gamescore-12": "Approved", "game-gamescore-13": "Not found", ...}}"""
+    results = {}
+    try:
+        data = simplejson.loads(request.raw_post_data)
+        action = data['action']
+        objects = data['objects']
+        assert request.method == 'POST' and action in ('approve', 'reject')
+        assert isinstance(objects, dict) and all([isinstance(ids, list) for ids in objects.values()])
+    except:
+        response_dict = {'message': "The request must be a POST with an action and the objects to moderate."}
+        return HttpResponse(simplejson.dumps(response_dict), mimetype='application/json', status=400)
+
+    with commit_on_success_unless_managed():
+        for app_model_string, ids in objects.items():
+            try:
+                app_string, model_string = app_model_string.split('-')
+                model = ContentType.objects.get_by_natural_key(app_string, model_string).model_class()
+                ids = [int(id) for id in ids]
+            except:
+                for id in ids:
+                    results['{0}-{1}'.format(app_model_string, id)] = "Not found"
+                continue
+
+            objects_by_id = model.objects.in_bulk(ids)
+            model._bulk_has_perms(objects_by_id.values(), request.user, ['approve'])
+            for id in ids:
+                app_object_id = '{0}-{1}'.format(app_model_string, id)
+                object = objects_by_id.get(id)
+                if object is None:
+                    results[app_object_id] = "Not found"
+                elif not object.perms['approve']:
+                    results[app_object_id] = "Permission denied"
+                else:
+                    sid = transaction.savepoint()
+                    try:
+                        if action == 'approve':
+                            object.approve(request)
+                            results[app_object_id] = "Approved"
+                        else:
+                            object.reject(request)
+                            results[app_object_id] = "Rejected"
+                        transaction.savepoint_commit(sid)
+                    except:
+                        transaction.savepoint_rollback(sid)
+                        results[app_object_id] = "Sorry. There was an unexpected problem. Please try again later."
+    response_dict = {'results': results}
+    return HttpResponse(simplejson.dumps(response_dict), mimetype='application/json')
+
+@login_required
+def cascade_job_status(request, job_id):
+    """AJAX method.
+
+    Returns the progress of a background status cascade:
+        {"id": 3, "done": false, "chunks": 40, "chunks_done": 12, "levels": 2, "updated": 6000}
+    Staff can see every cascade, and other users only their own."""
+    jobs = CascadeJob.objects.all()
+    if not request.user.is_staff:
+        jobs = jobs.filter(user=request.user)
+    try:
+        job = jobs.get(id=job_id)
+    except CascadeJob.DoesNotExist:
+        response_dict = {'message': "This cascade cannot be found."}
+    else:
+        response_dict = job.progress()
+    return HttpResponse(simplejson.dumps(response_dict), mimetype='application/json')
+
+@login_required
+def merge_job_status(request, job_id):
+    """AJAX method.
+
+    Returns the progress of a merge or unmerge job:
+        {"id": 5, "action": "merge", "phase": "rewrite", "done": false, "referrers": 1800,
+         "referrers_done": 500, "conflicts": 3, "conflicts_done": 0, "error": ""}
+    Staff can see every job, and other users only their own."""
+    jobs = MergeJob.objects.all()
+    if not request.user.is_staff:
+        jobs = jobs.filter(user=request.user)
+    try:
+        job = jobs.get(id=job_id)
+    except MergeJob.DoesNotExist:
+        response_dict = {'message': "This merge cannot be found."}
+    else:
+        response_dict = job.progress()
+    return HttpResponse(simplejson.dumps(response_dict), mimetype='application/json')
+
 def create_object(request, form_class, redirect_on_cancel, redirect_on_continue=None,
                   redirect_on_success=None, form_params=None, message=False, no_redirect=False):
     """ Creates either a form or a request object.
@@ -295,11 +393,10 @@ def remove_objects(request, model, queryset, redirect):
             return {'form': None,
                     'response': HttpResponseRedirect(redirect)}
         elif formset.is_valid():
-            for form in formset.forms:
-                if form.is_valid():
-                    if form.cleaned_data['DELETE']:
-                        object = form.instance
-                        object.remove(request)
+            ids = [form.instance.id for form in formset.forms \
+                   if form.is_valid() and form.cleaned_data['DELETE']]
+            if ids:
+                model.objects.filter(id__in=ids).remove_all(request)
         return {'form': None,
                 'response': HttpResponseRedirect(redirect)}
     else: